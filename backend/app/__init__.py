@@ -0,0 +1,6 @@
+from __future__ import annotations
+
+from app import config, imports
+
+if config.IMPORT_REPORT:
+    imports.start_import_timer()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hmac
+import time
+from typing import Iterable
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services import metrics, profiling
+
+
+class BodySizeLimitMiddleware:
+    """Rejects request bodies over ``max_bytes`` with 413 before they are fully read.
+
+    A declared Content-Length over the limit is refused without reading the
+    body at all; otherwise the body is counted as it streams in.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the {self.max_bytes} byte limit."
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+                return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as e:
+            if e.status_code != 413 or response_started:
+                raise
+            await JSONResponse({"detail": e.detail}, status_code=413)(scope, receive, send)
+
+
+class MetricsMiddleware:
+    """Records the latency of every HTTP request in ``fatiresume_http_request_seconds``.
+
+    Requests are labelled with their route template (``/api/analyze``), not
+    the raw path, so unknown paths share one ``other`` series.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def recording_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            route = scope.get("route")
+            metrics.observe(
+                "fatiresume_http_request_seconds",
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "other"),
+                status=str(status),
+            )
+
+
+class ProfilingMiddleware:
+    """Profiles requests to ``paths`` that ask for it with ``X-Profile: 1`` or ``?profile=1``.
+
+    The admin token must come in ``X-Admin-Token``, otherwise the request is
+    refused with 403. Profiled responses carry ``X-Profile-Id`` (the profile
+    is served at ``/api/profiles/<id>``) and a ``Server-Timing`` header with
+    the request total and the time of each stage.
+    """
+
+    def __init__(self, app: ASGIApp, token: str, paths: Iterable[str]):
+        self.app = app
+        self.token = token.encode("utf-8")
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        requested = headers.get("x-profile") or QueryParams(scope.get("query_string", b"")).get("profile")
+        if requested not in ("1", "true"):
+            await self.app(scope, receive, send)
+            return
+        if not hmac.compare_digest(headers.get("x-admin-token", "").encode("utf-8"), self.token):
+            await JSONResponse({"detail": "Profiling requires a valid X-Admin-Token."}, status_code=403)(
+                scope, receive, send
+            )
+            return
+
+        with profiling.profile_request(scope["path"]) as profile:
+
+            async def profiled_send(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    extra = [
+                        (b"x-profile-id", profile.id.encode("ascii")),
+                        (b"server-timing", profile.server_timing().encode("ascii")),
+                    ]
+                    message = {**message, "headers": list(message.get("headers", [])) + extra}
+                elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                    # Stored before the client has the body, so it can fetch the profile at once
+                    profile.finish()
+                await send(message)
+
+            await self.app(scope, receive, profiled_send)
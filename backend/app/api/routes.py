@@ -1,14 +1,41 @@
 from __future__ import annotations
 
-from typing import Optional
+import hmac
+import os
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, Header, HTTPException, Response, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
 
-from app.api.schemas import AnalyzeResponse, Country, EvidenceItem, JobsResponse, JobsResponseItem
-from app.services.bias import build_bias_report
-from app.services.jobs import build_job_query, find_jobs
-from app.services.parsing import parse_resume
-from app.services.scoring import analyze_resume
+from app import config
+from app.api.schemas import (
+    AnalyzeBatchItem,
+    AnalyzeBatchResponse,
+    AnalyzeResponse,
+    Country,
+    EvidenceItem,
+    JobsResponse,
+    JobsResponseItem,
+)
+from app.services import metrics
+from app.services.profiling import profile_store
+from app.services.bias import bias_cache_stats
+from app.services.job_corpus import get_job_corpus, search_corpus
+from app.services.jobs import build_job_query, find_jobs, search_cache
+from app.services.lexicons import get_lexicons, reload_lexicons
+from app.services.parse_cache import parse_cache_key
+from app.services.parsing import PARSER_VERSION, parse_cache, parse_resume, parse_resume_detailed, parse_resume_file
+from app.services.pools import run_cpu, run_io
+from app.services.scoring import (
+    analyze_resume,
+    analyze_resume_batch,
+    encoder_info,
+    get_embedding_model,
+    get_embedding_store,
+)
+from app.services.uploads import StoredUpload, UploadTooLarge, store_upload
 
 router = APIRouter()
 
@@ -18,23 +45,139 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+def _require_admin(token: Optional[str]) -> None:
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled (FATIRESUME_ADMIN_TOKEN is not set).")
+    if not hmac.compare_digest((token or "").encode("utf-8"), config.ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="A valid X-Admin-Token is required.")
+
+
+@router.get("/lexicons")
+def lexicons() -> dict:
+    return get_lexicons().stats()
+
+
+@router.post("/lexicons/reload")
+async def lexicons_reload(x_admin_token: Optional[str] = Header(None)) -> dict:
+    _require_admin(x_admin_token)
+    # Compiled off the event loop; requests keep the old version until the swap.
+    # CPU pool workers switch to it with their next task, see pools.run_cpu.
+    try:
+        lexicons = await run_io(reload_lexicons)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Lexicon reload failed: {e}")
+    return lexicons.stats()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    """Stage timings and counters of this worker process in the Prometheus text format."""
+    if not config.METRICS:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (FATIRESUME_METRICS=0).")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def _stored_profile(profile_id: str, token: Optional[str]) -> dict:
+    _require_admin(token)
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No profile {profile_id!r}.")
+    return profile
+
+
+@router.get("/profiles/{profile_id}")
+def profile(profile_id: str, x_admin_token: Optional[str] = Header(None)) -> dict:
+    """A stored request profile: duration, per-stage breakdown and collapsed stacks."""
+    return _stored_profile(profile_id, x_admin_token)
+
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+def profile_collapsed(profile_id: str, x_admin_token: Optional[str] = Header(None)) -> PlainTextResponse:
+    """Collapsed stacks of a profile, for flamegraph.pl or speedscope."""
+    return PlainTextResponse(_stored_profile(profile_id, x_admin_token)["collapsed"])
+
+
+@router.get("/cache/stats")
+async def cache_stats() -> dict:
+    stats = {
+        "job_search_cache": search_cache.stats(),
+        "parse_cache": parse_cache.stats(),
+    }
+    if config.CPU_POOL_SIZE <= 0:
+        # This process scores, so the encoder is loaded here anyway
+        stats["embedding_cache"] = (await run_io(get_embedding_model)).cache.stats()
+        stats["bias_cache"] = bias_cache_stats()
+    else:
+        # Scoring runs in the CPU pool, where each worker process fills its
+        # own caches; this process's copies stay empty. The workers' lookups
+        # are summed in the fatiresume_cache_requests_total counters instead.
+        stats["worker_caches"] = {
+            "caches": ["embedding", "bias"],
+            "processes": config.CPU_POOL_SIZE,
+            "counters": "/api/metrics",
+        }
+    corpus = await get_job_corpus()
+    if corpus is not None:
+        stats["job_corpus"] = corpus.stats()
+    if config.EMBEDDING_STORE_DIR:
+        store = await run_io(get_embedding_store, *await encoder_info())
+        stats["embedding_store"] = {"directory": store.directory, "rows": await run_io(len, store)}
+    return stats
+
+
+async def _store(upload: UploadFile) -> StoredUpload:
+    """Stream an upload to a temporary file, refusing it with 413 past the size limit."""
+    try:
+        with metrics.span("routes.upload"):
+            return await run_io(
+                store_upload, upload.file, upload.filename or "", config.UPLOAD_MAX_BYTES, config.UPLOAD_DIR
+            )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+async def _parse(resume_text: Optional[str], upload: Optional[StoredUpload]) -> Tuple[str, str, str]:
+    """Parsed resume text, the parse cache outcome ("hit", "miss" or "none") and the parse backend."""
+    if (resume_text and resume_text.strip()) or upload is None or not upload.size or not upload.filename:
+        parsed, backend = await run_cpu(parse_resume_detailed, resume_text=resume_text, filename=None)
+        return parsed, "none", backend
+
+    key = parse_cache_key(upload.filename, upload.sha256, PARSER_VERSION)
+    cached = await run_io(parse_cache.get, key)
+    metrics.inc("fatiresume_cache_requests_total", cache="parse", outcome="miss" if cached is None else "hit")
+    if cached is not None:
+        return cached, "hit", "cache"
+
+    parsed, backend = await parse_resume_file(upload.filename, upload.path)
+    await run_io(parse_cache.put, key, parsed)
+    return parsed, "miss", backend
+
+
+async def _parse_upload(resume_text: Optional[str], resume_file: Optional[UploadFile]) -> Tuple[str, str, str]:
+    stored = await _store(resume_file) if resume_file is not None else None
+    try:
+        with metrics.span("routes.parse"):
+            parsed, outcome, backend = await _parse(resume_text, stored)
+        metrics.inc("fatiresume_parse_backend_total", backend=backend)
+        return parsed, outcome, backend
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if stored is not None:
+            stored.remove()
+
+
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze(
+    response: Response,
     job_description: str = Form(...),
     country: Country = Form(...),
     resume_text: Optional[str] = Form(None),
     resume_file: Optional[UploadFile] = File(None),
-) -> AnalyzeResponse:
-    file_bytes: Optional[bytes] = None
-    filename: Optional[str] = None
-    if resume_file is not None:
-        filename = resume_file.filename
-        file_bytes = await resume_file.read()
-
-    try:
-        parsed_resume = parse_resume(resume_text=resume_text, filename=filename, file_bytes=file_bytes)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+) -> JSONResponse:
+    parsed_resume, parse_outcome, parse_backend = await _parse_upload(resume_text, resume_file)
+    response.headers["X-Parse-Cache"] = parse_outcome
+    response.headers["X-Parse-Backend"] = parse_backend
 
     if not parsed_resume.strip():
         raise HTTPException(
@@ -42,38 +185,133 @@ async def analyze(
             detail="No resume content found. Paste resume text or upload a PDF/DOCX.",
         )
 
-    result = analyze_resume(resume_text=parsed_resume, job_description=job_description, country=country)
-    bias_report = build_bias_report(parsed_resume + "\n" + job_description)
+    with metrics.span("routes.analyze"):
+        result = await run_cpu(analyze_resume, resume_text=parsed_resume, job_description=job_description, country=country)
 
     resume_source = "text" if (resume_text and resume_text.strip()) else "file" if resume_file else "none"
 
+    with metrics.span("routes.serialize"):
+        return _json_response(_analyze_response(result), response)
+
+
+def _json_response(model: BaseModel, response: Response) -> JSONResponse:
+    """``model`` encoded to JSON right away, keeping the headers set on ``response``.
+
+    A returned model is only encoded by FastAPI after the endpoint returns,
+    outside the ``routes.serialize`` span.
+    """
+    out = JSONResponse(jsonable_encoder(model))
+    out.headers.raw.extend(response.headers.raw)
+    return out
+
+
+def _analyze_response(result: dict) -> AnalyzeResponse:
     return AnalyzeResponse(
         match_score=result["match_score"],
         confidence=result["confidence"],
         top_matches=result["top_matches"],
         missing_skills=result["missing_skills"],
         evidence=result["evidence"],
-        bias_report=bias_report,
+        bias_report=result["bias_report"],
         country_breakdown=result["country_breakdown"],
     )
 
 
+@router.post("/analyze/batch", response_model=AnalyzeBatchResponse)
+async def analyze_batch(
+    response: Response,
+    country: Country = Form(...),
+    job_description: Optional[str] = Form(None),
+    job_descriptions: Optional[List[str]] = Form(None),
+    resume_text: Optional[str] = Form(None),
+    resume_texts: Optional[List[str]] = Form(None),
+    resume_file: Optional[UploadFile] = File(None),
+    resume_files: Optional[List[UploadFile]] = File(None),
+) -> JSONResponse:
+    jobs_in = [j for j in ([job_description] if job_description else []) + list(job_descriptions or []) if j.strip()]
+    if not jobs_in:
+        raise HTTPException(status_code=400, detail="Provide at least one job description.")
+
+    texts = [t for t in ([resume_text] if resume_text else []) + list(resume_texts or []) if t.strip()]
+    uploads = ([resume_file] if resume_file is not None else []) + list(resume_files or [])
+    n_resumes = len(texts) + len(uploads)
+    if not n_resumes:
+        raise HTTPException(
+            status_code=400,
+            detail="No resume content found. Paste resume text or upload a PDF/DOCX.",
+        )
+
+    # Shape and size are checked before anything is stored or parsed
+    if n_resumes > 1 and len(jobs_in) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Send one resume with many job descriptions, or many resumes with one job description.",
+        )
+
+    if n_resumes * len(jobs_in) > config.ANALYZE_BATCH_MAX_PAIRS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.ANALYZE_BATCH_MAX_PAIRS} resume/job pairs per batch.",
+        )
+
+    # Pasted text only needs whitespace cleanup, which is cheaper inline than
+    # a CPU pool round trip per resume
+    resumes_in: List[str] = []
+    for text in texts:
+        resumes_in.append(parse_resume(text, None))
+        metrics.inc("fatiresume_parse_backend_total", backend="text")
+
+    # Each upload is parsed once; identical uploads share one parse
+    parsed_by_source: dict = {}
+    parse_outcomes: List[str] = []
+    parse_backends: List[str] = []
+    for upload in uploads:
+        stored = await _store(upload)
+        try:
+            key = (os.path.splitext(stored.filename.lower())[1], stored.sha256)
+            if key not in parsed_by_source:
+                with metrics.span("routes.parse"):
+                    parsed_by_source[key], outcome, backend = await _parse(None, stored)
+                metrics.inc("fatiresume_parse_backend_total", backend=backend)
+                parse_outcomes.append(outcome)
+                parse_backends.append(backend)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        finally:
+            stored.remove()
+        resumes_in.append(parsed_by_source[key])
+    if parse_outcomes:
+        response.headers["X-Parse-Cache"] = ",".join(parse_outcomes)
+        response.headers["X-Parse-Backend"] = ",".join(parse_backends)
+
+    if not all(r.strip() for r in resumes_in):
+        raise HTTPException(
+            status_code=400,
+            detail="No resume content found. Paste resume text or upload a PDF/DOCX.",
+        )
+
+    with metrics.span("routes.analyze_batch"):
+        results = await run_cpu(analyze_resume_batch, resume_texts=resumes_in, job_descriptions=jobs_in, country=country)
+
+    with metrics.span("routes.serialize"):
+        items = [
+            AnalyzeBatchItem(resume_index=i, job_index=j, result=_analyze_response(result))
+            for i, row in enumerate(results)
+            for j, result in enumerate(row)
+        ]
+        return _json_response(AnalyzeBatchResponse(results=items), response)
+
+
 @router.post("/jobs", response_model=JobsResponse)
 async def jobs(
+    response: Response,
     query: Optional[str] = Form(None),
     resume_text: Optional[str] = Form(None),
     resume_file: Optional[UploadFile] = File(None),
 ) -> JobsResponse:
-    file_bytes: Optional[bytes] = None
-    filename: Optional[str] = None
-    if resume_file is not None:
-        filename = resume_file.filename
-        file_bytes = await resume_file.read()
-
-    try:
-        parsed_resume = parse_resume(resume_text=resume_text, filename=filename, file_bytes=file_bytes)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    parsed_resume, parse_outcome, parse_backend = await _parse_upload(resume_text, resume_file)
+    response.headers["X-Parse-Cache"] = parse_outcome
+    response.headers["X-Parse-Backend"] = parse_backend
 
     if not parsed_resume.strip():
         raise HTTPException(
@@ -82,7 +320,14 @@ async def jobs(
         )
 
     q = build_job_query(resume_text=parsed_resume, query=query)
-    results = find_jobs(resume_text=parsed_resume, query=q, top_k=10)
+    corpus = await get_job_corpus()
+    with metrics.span("routes.job_search"):
+        # The corpus holds postings for the configured queries only, so an
+        # explicit query goes to the job boards (through the query cache)
+        if corpus is not None and len(corpus) >= config.JOB_CORPUS_MIN_JOBS and not (query and query.strip()):
+            results = await search_corpus(corpus, parsed_resume, top_k=10)
+        else:
+            results = await find_jobs(resume_text=parsed_resume, query=q, top_k=10)
 
     return JobsResponse(
         query=q,
@@ -16,6 +16,7 @@ class Country(str, Enum):
 class EvidenceItem(BaseModel):
     text: str
     score: float = Field(ge=0.0)
+    job_text: Optional[str] = None
 
 
 class BiasFlag(BaseModel):
@@ -39,6 +40,16 @@ class AnalyzeResponse(BaseModel):
     country_breakdown: dict
 
 
+class AnalyzeBatchItem(BaseModel):
+    resume_index: int = Field(ge=0)
+    job_index: int = Field(ge=0)
+    result: AnalyzeResponse
+
+
+class AnalyzeBatchResponse(BaseModel):
+    results: List[AnalyzeBatchItem] = Field(default_factory=list)
+
+
 class AnalyzeForm(BaseModel):
     resume_text: Optional[str] = None
     job_description: str
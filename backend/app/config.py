@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def _env_str(name: str, default: str) -> str:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip()
+
+
+# Embedding cache bounds (entries and total vector bytes)
+EMBEDDING_CACHE_MAX_ENTRIES = _env_int("FATIRESUME_EMBEDDING_CACHE_ENTRIES", 4096)
+EMBEDDING_CACHE_MAX_BYTES = _env_int("FATIRESUME_EMBEDDING_CACHE_BYTES", 64 * 1024 * 1024)
+
+# Documents whose bias lexicon matches are remembered, keyed by content hash
+BIAS_CACHE_MAX_ENTRIES = _env_int("FATIRESUME_BIAS_CACHE_ENTRIES", 4096)
+
+# Bias and skill lexicon files (bias.json, skills.json); empty uses the
+# bundled app/data/lexicons. Compiled matchers are cached in LEXICON_CACHE_DIR
+# and the files are checked for changes every LEXICON_CHECK_SECONDS (0 = never).
+LEXICON_DIR = _env_str("FATIRESUME_LEXICON_DIR", "")
+LEXICON_CACHE_DIR = _env_str("FATIRESUME_LEXICON_CACHE_DIR", "")
+LEXICON_CHECK_SECONDS = _env_float("FATIRESUME_LEXICON_CHECK_SECONDS", 2.0)
+
+# Embedding backend: "keyword" (SimpleModel) or "sentence-transformers"
+EMBEDDING_BACKEND = _env_str("FATIRESUME_EMBEDDING_BACKEND", "keyword").lower()
+ST_MODEL = _env_str("FATIRESUME_ST_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+ST_BATCH_SIZE = _env_int("FATIRESUME_ST_BATCH_SIZE", 32)
+ST_MAX_SEQ_LENGTH = _env_int("FATIRESUME_ST_MAX_SEQ_LENGTH", 256)
+# "" (float32), "int8" (dynamic quantization) or "onnx" (ONNX Runtime)
+ST_QUANTIZE = _env_str("FATIRESUME_ST_QUANTIZE", "").lower()
+ST_ONNX_FILE = _env_str("FATIRESUME_ST_ONNX_FILE", "")
+
+# Directory of the persistent embedding store shared by workers; empty disables it
+EMBEDDING_STORE_DIR = _env_str("FATIRESUME_EMBEDDING_STORE_DIR", "")
+
+# Upper bound on resume/job pairs in one /api/analyze/batch request
+ANALYZE_BATCH_MAX_PAIRS = _env_int("FATIRESUME_ANALYZE_BATCH_MAX_PAIRS", 500)
+
+# Worker pools: threads for blocking I/O, processes for parsing and scoring
+# (0 processes runs CPU work on the thread pool instead)
+IO_POOL_SIZE = _env_int("FATIRESUME_IO_POOL_SIZE", 16)
+CPU_POOL_SIZE = _env_int("FATIRESUME_CPU_POOL_SIZE", min(4, os.cpu_count() or 1))
+
+# Job board providers: endpoints (overridable for stub servers), per-provider
+# deadline and overall search budget in seconds, and pooled connections
+REMOTIVE_URL = _env_str("FATIRESUME_REMOTIVE_URL", "https://remotive.com/api/remote-jobs")
+ARBEITNOW_URL = _env_str("FATIRESUME_ARBEITNOW_URL", "https://www.arbeitnow.com/api/job-board-api")
+JOB_PROVIDER_TIMEOUT = _env_float("FATIRESUME_JOB_PROVIDER_TIMEOUT", 10.0)
+JOB_SEARCH_BUDGET = _env_float("FATIRESUME_JOB_SEARCH_BUDGET", 12.0)
+JOB_HTTP_MAX_CONNECTIONS = _env_int("FATIRESUME_JOB_HTTP_MAX_CONNECTIONS", 20)
+
+# Job search result cache: seconds fresh, extra seconds served stale while
+# refreshing, and max cached queries (TTL 0 disables it)
+JOB_CACHE_TTL = _env_float("FATIRESUME_JOB_CACHE_TTL", 300.0)
+JOB_CACHE_STALE_TTL = _env_float("FATIRESUME_JOB_CACHE_STALE_TTL", 1800.0)
+JOB_CACHE_MAX_ENTRIES = _env_int("FATIRESUME_JOB_CACHE_MAX_ENTRIES", 1024)
+
+# Local job corpus: ingest postings for these queries every refresh period and
+# serve /api/jobs from vector search once it holds enough postings
+JOB_CORPUS_ENABLED = _env_int("FATIRESUME_JOB_CORPUS", 0) > 0
+JOB_CORPUS_DIR = _env_str("FATIRESUME_JOB_CORPUS_DIR", "")
+JOB_CORPUS_QUERIES = [
+    q.strip()
+    for q in _env_str(
+        "FATIRESUME_JOB_CORPUS_QUERIES",
+        "python,machine learning,data science,javascript,react,devops,sql,cloud",
+    ).split(",")
+    if q.strip()
+]
+JOB_CORPUS_REFRESH_SECONDS = _env_float("FATIRESUME_JOB_CORPUS_REFRESH_SECONDS", 3600.0)
+JOB_CORPUS_FETCH_LIMIT = _env_int("FATIRESUME_JOB_CORPUS_FETCH_LIMIT", 100)
+JOB_CORPUS_MAX_JOBS = _env_int("FATIRESUME_JOB_CORPUS_MAX_JOBS", 100_000)
+JOB_CORPUS_MIN_JOBS = _env_int("FATIRESUME_JOB_CORPUS_MIN_JOBS", 50)
+# Hold keyword-model corpus embeddings as bitsets plus a few floats (about
+# a tenth of the dense size); other encoders always use dense rows
+JOB_CORPUS_PACKED = _env_int("FATIRESUME_JOB_CORPUS_PACKED", 1) == 1
+
+# PDFs with at least this many pages are extracted in page ranges on a
+# dedicated process pool of this size (a size of 1 keeps extraction serial)
+PDF_PARALLEL_MIN_PAGES = _env_int("FATIRESUME_PDF_PARALLEL_MIN_PAGES", 8)
+PDF_POOL_SIZE = _env_int("FATIRESUME_PDF_POOL_SIZE", min(4, os.cpu_count() or 1))
+
+# Parsed upload text cache, keyed by file content hash; the directory is optional
+PARSE_CACHE_MAX_ENTRIES = _env_int("FATIRESUME_PARSE_CACHE_ENTRIES", 512)
+PARSE_CACHE_MAX_CHARS = _env_int("FATIRESUME_PARSE_CACHE_CHARS", 32 * 1024 * 1024)
+PARSE_CACHE_DIR = _env_str("FATIRESUME_PARSE_CACHE_DIR", "")
+
+# Upload limits: per file, and for a whole request body (checked while it
+# streams in), plus where uploads are spooled (default: system temp dir)
+UPLOAD_MAX_BYTES = _env_int("FATIRESUME_UPLOAD_MAX_BYTES", 10 * 1024 * 1024)
+REQUEST_MAX_BYTES = _env_int("FATIRESUME_REQUEST_MAX_BYTES", 50 * 1024 * 1024)
+UPLOAD_DIR = _env_str("FATIRESUME_UPLOAD_DIR", "")
+
+# Text-only PDF backends tried before pdfplumber, and the quality bar their
+# output must pass (minimum characters per page, maximum garbled share)
+PDF_FAST_BACKENDS = [
+    b.strip() for b in _env_str("FATIRESUME_PDF_FAST_BACKENDS", "pdfium").split(",") if b.strip()
+]
+PDF_FAST_MIN_CHARS_PER_PAGE = _env_int("FATIRESUME_PDF_FAST_MIN_CHARS_PER_PAGE", 40)
+PDF_FAST_MAX_GARBLED_RATIO = _env_float("FATIRESUME_PDF_FAST_MAX_GARBLED_RATIO", 0.05)
+
+# Startup: log the slowest module imports, and warm the encoder, lexicons
+# and parsers in the background once the server is accepting requests
+IMPORT_REPORT = _env_int("FATIRESUME_IMPORT_REPORT", 0) == 1
+WARMUP = _env_int("FATIRESUME_WARMUP", 0) == 1
+
+# Per-stage timings and counters served at /api/metrics (0 disables recording)
+METRICS = _env_int("FATIRESUME_METRICS", 1) == 1
+
+# Admin token for POST /api/lexicons/reload and per-request profiling (empty
+# disables both). Requests to /api/analyze(/batch) and /api/jobs with
+# "X-Profile: 1" or "?profile=1" and this token in "X-Admin-Token" run under a
+# sampling profiler. The last PROFILE_MAX_ENTRIES profiles are kept in memory,
+# and in PROFILE_DIR when set.
+ADMIN_TOKEN = _env_str("FATIRESUME_ADMIN_TOKEN", "")
+PROFILE_INTERVAL_MS = _env_float("FATIRESUME_PROFILE_INTERVAL_MS", 5.0)
+PROFILE_MAX_ENTRIES = _env_int("FATIRESUME_PROFILE_MAX_ENTRIES", 32)
+PROFILE_DIR = _env_str("FATIRESUME_PROFILE_DIR", "")
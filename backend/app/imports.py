@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import builtins
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple
+
+# Seconds spent on the first import of each module, including its own imports
+_import_seconds: Dict[str, float] = {}
+_original_import = builtins.__import__
+
+
+class LazyModule:
+    """Stand-in for a heavy module that is imported on first attribute access.
+
+    Module-level ``pdfplumber = lazy_import("pdfplumber")`` keeps the name
+    usable as usual while the API process boots without loading it.
+    """
+
+    def __init__(self, name: str):
+        self._lazy_name = name
+        self._lazy_module: Optional[ModuleType] = None
+        self._lazy_lock = threading.Lock()
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self._lazy_module
+        if module is None:
+            module = ensure_loaded(self)
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._lazy_module is not None else "not loaded"
+        return f"<lazy module {self._lazy_name!r} ({state})>"
+
+
+def lazy_import(name: str, optional: bool = False) -> Optional[LazyModule]:
+    """A ``LazyModule`` for ``name``; None if ``optional`` and it isn't installed."""
+    if optional and importlib.util.find_spec(name) is None:
+        return None
+    return LazyModule(name)
+
+
+def ensure_loaded(module: LazyModule) -> ModuleType:
+    """Import the module behind ``module`` now, e.g. during warm-up."""
+    with module._lazy_lock:
+        if module._lazy_module is None:
+            start = time.perf_counter()
+            loaded = importlib.import_module(module._lazy_name)
+            _import_seconds.setdefault(module._lazy_name, time.perf_counter() - start)
+            module._lazy_module = loaded
+        return module._lazy_module
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _import_seconds.setdefault(name, time.perf_counter() - start)
+
+
+def start_import_timer() -> None:
+    """Time the first import of every module from now on (``FATIRESUME_IMPORT_REPORT``)."""
+    builtins.__import__ = _timed_import
+
+
+def stop_import_timer() -> None:
+    if builtins.__import__ is _timed_import:
+        builtins.__import__ = _original_import
+
+
+def import_report(top: int = 20) -> List[Tuple[str, float]]:
+    """The slowest first imports as ``(module, seconds)``.
+
+    Times are cumulative: a package includes the modules it imports.
+    """
+    return sorted(_import_seconds.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def format_import_report(top: int = 20) -> str:
+    lines = ["Import time (cumulative, first import):"]
+    lines.extend(f"  {seconds * 1000:8.1f} ms  {name}" for name, seconds in import_report(top))
+    return "\n".join(lines)
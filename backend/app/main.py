@@ -1,15 +1,42 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+
 import swagger_ui_bundle
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from app import config, imports
+from app.api.middleware import BodySizeLimitMiddleware, MetricsMiddleware, ProfilingMiddleware
 from app.api.routes import router as api_router
+from app.services.job_corpus import run_ingestion
+from app.services.jobs import close_http_client
+from app.services.pools import shutdown_pools
+from app.services.warmup import warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Started in the background: with a sentence-transformer the corpus
+    # waits for a CPU worker to load the model
+    ingestion = asyncio.ensure_future(run_ingestion()) if config.JOB_CORPUS_ENABLED else None
+    warmup = asyncio.ensure_future(warm_up()) if config.WARMUP else None
+    yield
+    if ingestion is not None:
+        ingestion.cancel()
+    if warmup is not None:
+        warmup.cancel()
+    await close_http_client()
+    shutdown_pools()
 
 
 def create_app() -> FastAPI:
     app = FastAPI(
         title="Resume Match API",
         version="0.1.0",
+        lifespan=lifespan,
         swagger_ui_parameters={
             "swagger_ui_css_url": "/static/swagger/swagger-ui.css",
             "swagger_ui_js_url": "/static/swagger/swagger-ui-bundle.js",
@@ -31,8 +58,33 @@ def create_app() -> FastAPI:
         allow_headers=["*"]
     )
 
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=config.REQUEST_MAX_BYTES)
+
+    if config.ADMIN_TOKEN:
+        app.add_middleware(
+            ProfilingMiddleware,
+            token=config.ADMIN_TOKEN,
+            paths=("/api/analyze", "/api/analyze/batch", "/api/jobs"),
+        )
+
+    if config.METRICS:
+        app.add_middleware(MetricsMiddleware)
+
+    @app.exception_handler(BrokenProcessPool)
+    async def cpu_pool_unavailable(request: Request, exc: BrokenProcessPool) -> JSONResponse:
+        # run_cpu already replaced the pool and retried once
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Processing workers are restarting, please retry."},
+            headers={"Retry-After": "1"},
+        )
+
     app.include_router(api_router, prefix="/api")
     return app
 
 
 app = create_app()
+
+if config.IMPORT_REPORT:
+    imports.stop_import_timer()
+    print(imports.format_import_report())
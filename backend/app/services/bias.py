@@ -1,60 +1,137 @@
 from __future__ import annotations
 
-import re
-from typing import Iterable, List
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
 
+from app import config
 from app.api.schemas import BiasFlag, BiasReport
-
-
-_GENDER_CODED = {
-    "aggressive": "Consider more neutral wording.",
-    "ninja": "Consider more neutral wording.",
-    "rockstar": "Consider more neutral wording.",
-    "dominant": "Consider more neutral wording.",
-}
-
-_AGE_CODED = {
-    "young": "Avoid age-related wording.",
-    "energetic": "Avoid age-related wording.",
-    "digital native": "Avoid age-related wording.",
-}
-
-_NATIONALITY_CODED = {
-    "native": "Be careful with nationality/citizenship implications.",
-    "citizenship": "Be careful with nationality/citizenship implications.",
-}
-
-_EDUCATION_PRESTIGE = {
-    "ivy league": "Education prestige may introduce bias.",
-    "oxford": "Education prestige may introduce bias.",
-    "cambridge": "Education prestige may introduce bias.",
-}
-
-
-def _find_terms(text: str, terms: Iterable[str]) -> List[str]:
-    found: List[str] = []
-    lowered = text.lower()
-    for term in terms:
-        if re.search(r"\b" + re.escape(term) + r"\b", lowered):
-            found.append(term)
-    return found
-
-
-def build_bias_report(text: str) -> BiasReport:
-    flags: List[BiasFlag] = []
-
-    for term in _find_terms(text, _GENDER_CODED.keys()):
-        flags.append(BiasFlag(category="gendered_wording", term=term, message=_GENDER_CODED[term]))
-
-    for term in _find_terms(text, _AGE_CODED.keys()):
-        flags.append(BiasFlag(category="age_wording", term=term, message=_AGE_CODED[term]))
-
-    for term in _find_terms(text, _NATIONALITY_CODED.keys()):
-        flags.append(BiasFlag(category="nationality_wording", term=term, message=_NATIONALITY_CODED[term]))
-
-    for term in _find_terms(text, _EDUCATION_PRESTIGE.keys()):
-        flags.append(BiasFlag(category="education_prestige", term=term, message=_EDUCATION_PRESTIGE[term]))
-
-    risk_score = min(1.0, 0.1 + 0.08 * len(flags)) if flags else 0.05
-
-    return BiasReport(risk_score=risk_score, flags=flags)
+from app.services import metrics
+from app.services.lexicons import get_lexicons
+from app.services.matcher import KeywordMatches, Matcher, compile_matcher
+
+
+class BiasScanner:
+    """Bias lexicon compiled into a keyword matcher.
+
+    Terms are flagged on word boundaries, with the ``\\b<term>\\b``
+    semantics of a separate regex search per term and overlapping matches
+    included ("native" inside "digital native"). Large lexicons use an
+    Aho-Corasick automaton, so the scan does not grow with their size.
+
+    The terms found in each document are cached by content hash, so a
+    resume or posting reused across requests is scanned only once.
+    """
+
+    def __init__(
+        self,
+        categories: Mapping[str, Mapping[str, str]],
+        max_cached_documents: int = 0,
+        matcher: Optional[Matcher] = None,
+        version: str = "",
+    ):
+        self.version = version
+        # Flags of each term in report order: category order, then term order
+        self._flags_by_term: Dict[str, List[Tuple[int, str, str]]] = {}
+        order = 0
+        for category, terms in categories.items():
+            for term, message in terms.items():
+                self._flags_by_term.setdefault(term.lower(), []).append((order, category, message))
+                order += 1
+        self._matcher = matcher or compile_matcher(self._flags_by_term)
+
+        self.max_cached_documents = max_cached_documents
+        self._found: "OrderedDict[bytes, FrozenSet[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def scan(self, text: str) -> KeywordMatches:
+        """Start offsets of every lexicon term in ``text.lower()``."""
+        return self._matcher.scan(text, whole_words=True)
+
+    def document_terms(self, text: str) -> FrozenSet[str]:
+        """Lexicon terms found in one document, cached by its content hash."""
+        key = hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest()
+        with self._lock:
+            found = self._found.get(key)
+            if found is not None:
+                self._found.move_to_end(key)
+                self.hits += 1
+                metrics.inc("fatiresume_cache_requests_total", cache="bias", outcome="hit")
+                return found
+            self.misses += 1
+        metrics.inc("fatiresume_cache_requests_total", cache="bias", outcome="miss")
+
+        found = frozenset(self._matcher.found(text, whole_words=True))
+        if self.max_cached_documents > 0:
+            with self._lock:
+                self._found[key] = found
+                while len(self._found) > self.max_cached_documents:
+                    self._found.popitem(last=False)
+        return found
+
+    def report(self, *texts: str) -> BiasReport:
+        """Report for ``"\\n".join(texts)``, combined from per-document scans.
+
+        A newline never extends a lexicon term, so no term can match across
+        two documents and the union of their terms is the joined text's.
+        """
+        found = set().union(*(self.document_terms(t) for t in texts))
+        hits = sorted(
+            (order, category, term, message)
+            for term in found
+            for order, category, message in self._flags_by_term.get(term, ())
+        )
+        flags = [
+            BiasFlag(category=category, term=term, message=message)
+            for _, category, term, message in hits
+        ]
+        risk_score = min(1.0, 0.1 + 0.08 * len(flags)) if flags else 0.05
+
+        return BiasReport(risk_score=risk_score, flags=flags)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._found.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._found),
+                "max_entries": self.max_cached_documents,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_scanner: Optional[BiasScanner] = None
+
+
+def get_bias_scanner() -> BiasScanner:
+    """Scanner for the current lexicons; replaced, with a fresh cache, when they change."""
+    global _scanner
+    lexicons = get_lexicons()
+    scanner = _scanner
+    if scanner is None or scanner.version != lexicons.version:
+        scanner = BiasScanner(
+            lexicons.bias_categories,
+            max_cached_documents=config.BIAS_CACHE_MAX_ENTRIES,
+            matcher=lexicons.bias_matcher,
+            version=lexicons.version,
+        )
+        _scanner = scanner
+    return scanner
+
+
+def build_bias_report(*texts: str) -> BiasReport:
+    """Bias report for one document, or for several read as one (e.g. resume and job)."""
+    with metrics.span("bias.report"):
+        return get_bias_scanner().report(*texts)
+
+
+def bias_cache_stats() -> Dict[str, float]:
+    return get_bias_scanner().stats()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from app.imports import lazy_import
+from app.services import metrics
+
+np = lazy_import("numpy")
+
+if TYPE_CHECKING:
+    from app.services.embedding_store import EmbeddingStore
+
+
+def model_identity(model) -> str:
+    return getattr(model, "model_id", None) or type(model).__qualname__
+
+
+def embedding_key(model_id: str, text: str, normalize: bool) -> str:
+    h = hashlib.sha256()
+    h.update(model_id.encode("utf-8"))
+    h.update(b"\x00n" if normalize else b"\x00r")
+    h.update(text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class EmbeddingCache:
+    """LRU cache of float32 vectors bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vec = self._data.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def put(self, key: str, vec: np.ndarray) -> None:
+        vec = np.array(vec, dtype=np.float32, copy=True)
+        vec.setflags(write=False)
+        if self.max_entries <= 0 or vec.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._data[key] = vec
+            self._bytes += vec.nbytes
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+class CachedEncoder:
+    """Wraps an encoder so each distinct text is only encoded once.
+
+    Keys are a hash of the model identity, the normalization flag and the
+    text, so different models never share vectors. An optional persistent
+    ``store`` is consulted after the in-memory cache and before encoding;
+    new vectors are written to it unless ``encode`` is called with
+    ``persist=False``.
+    """
+
+    def __init__(self, model, cache: EmbeddingCache, store: Optional["EmbeddingStore"] = None):
+        self.model = model
+        self.cache = cache
+        self.store = store
+        self.model_id = model_identity(model)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def encode(self, texts, normalize_embeddings=True, persist=True):
+        texts = list(texts)
+        keys = [embedding_key(self.model_id, t, normalize_embeddings) for t in texts]
+
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        missing_texts: List[str] = []
+        seen = set()
+        for key, text in zip(keys, texts):
+            if key in seen:
+                continue
+            seen.add(key)
+            vec = self.cache.get(key)
+            if vec is None:
+                missing.append(key)
+                missing_texts.append(text)
+            else:
+                found[key] = vec
+
+        metrics.inc("fatiresume_cache_requests_total", len(found), cache="embedding", outcome="hit")
+        if missing and self.store is not None:
+            stored = self.store.get_many(missing)
+            metrics.inc("fatiresume_cache_requests_total", len(stored), cache="embedding", outcome="store_hit")
+            if stored:
+                for key, vec in stored.items():
+                    self.cache.put(key, vec)
+                    found[key] = vec
+                still_missing = [(k, t) for k, t in zip(missing, missing_texts) if k not in stored]
+                missing = [k for k, _ in still_missing]
+                missing_texts = [t for _, t in still_missing]
+
+        if missing_texts:
+            metrics.inc("fatiresume_cache_requests_total", len(missing_texts), cache="embedding", outcome="miss")
+            encoded = np.asarray(
+                self.model.encode(missing_texts, normalize_embeddings=normalize_embeddings),
+                dtype=np.float32,
+            )
+            for key, vec in zip(missing, encoded):
+                self.cache.put(key, vec)
+                found[key] = vec
+            if persist and self.store is not None:
+                self.store.put_many(list(zip(missing, encoded)))
+
+        if not texts:
+            dim = getattr(self.model, "dim", 0)
+            return np.zeros((0, dim), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Keys are sha256 hex digests (see ``embedding_cache.embedding_key``)
+_KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive inter-process lock held on a sidecar lock file."""
+    with open(path, "a+b") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class EmbeddingStore:
+    """Append-only on-disk embedding matrix shared between processes.
+
+    ``vectors.f32`` holds raw float32 rows of width ``dim`` and is read
+    through a memory map, so lookups return views without copying.
+    ``index.tsv`` maps a key to its row, one ``key<TAB>row`` line per entry.
+    Writers append the rows first and the index lines last under a file
+    lock, so readers only ever see rows that are fully written.
+    """
+
+    def __init__(self, directory: str, dim: int, model_id: str = ""):
+        self.directory = directory
+        self.dim = dim
+        self._row_bytes = dim * 4
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._index_path = os.path.join(directory, "index.tsv")
+        self._lock_path = os.path.join(directory, ".lock")
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._index_offset = 0
+        self._mmap: Optional[np.memmap] = None
+        self._mapped_rows = 0
+
+        self._check_meta(model_id)
+        with self._lock:
+            self._refresh_index()
+
+    def _check_meta(self, model_id: str) -> None:
+        meta_path = os.path.join(self.directory, "meta.json")
+        with file_lock(self._lock_path):
+            if os.path.exists(meta_path):
+                with open(meta_path, "r", encoding="utf-8") as fh:
+                    meta = json.load(fh)
+                if meta.get("dim") != self.dim or meta.get("model_id", "") != model_id:
+                    raise ValueError(
+                        f"Embedding store at {self.directory} was built for "
+                        f"{meta.get('model_id')!r} (dim {meta.get('dim')})"
+                    )
+                return
+            tmp_path = meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump({"dim": self.dim, "model_id": model_id}, fh)
+            os.replace(tmp_path, meta_path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh_index()
+            return len(self._index)
+
+    def _refresh_index(self) -> None:
+        # Pick up index lines appended by any process since the last read
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "rb") as fh:
+            fh.seek(self._index_offset)
+            chunk = fh.read()
+        if not chunk:
+            return
+        end = chunk.rfind(b"\n") + 1
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        rows = size // self._row_bytes
+        for line in chunk[:end].splitlines():
+            key, _, row = line.decode("ascii", "replace").partition("\t")
+            if _KEY_RE.fullmatch(key) and row.isdigit() and int(row) < rows:
+                self._index[key] = int(row)
+        self._index_offset += end
+
+    def _matrix(self, min_rows: int) -> Optional[np.memmap]:
+        if self._mmap is not None and self._mapped_rows >= min_rows:
+            return self._mmap
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        rows = size // self._row_bytes
+        if rows == 0:
+            return None
+        self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        self._mapped_rows = rows
+        return self._mmap
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        keys = list(keys)
+        out: Dict[str, np.ndarray] = {}
+        with self._lock:
+            if any(k not in self._index for k in keys):
+                self._refresh_index()
+            rows = [(k, self._index[k]) for k in keys if k in self._index]
+            if not rows:
+                return out
+            matrix = self._matrix(max(r for _, r in rows) + 1)
+            if matrix is None:
+                return out
+            for key, row in rows:
+                if row < self._mapped_rows:
+                    out[key] = matrix[row]
+        return out
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Sequence[Tuple[str, np.ndarray]]) -> int:
+        """Append vectors for keys not stored yet; returns how many were added."""
+        with self._lock, file_lock(self._lock_path):
+            self._refresh_index()
+            pending: Dict[str, np.ndarray] = {}
+            for key, vec in items:
+                if key not in self._index and key not in pending:
+                    pending[key] = vec
+            if not pending:
+                return 0
+
+            block = np.asarray(list(pending.values()), dtype=np.float32).reshape(len(pending), self.dim)
+            with open(self._vectors_path, "a+b") as fh:
+                fh.seek(0, os.SEEK_END)
+                size = fh.tell()
+                if size % self._row_bytes:
+                    # A writer died mid-row; those bytes were never indexed
+                    size -= size % self._row_bytes
+                    fh.truncate(size)
+                    fh.seek(size)
+                start = size // self._row_bytes
+                fh.write(block.tobytes())
+                fh.flush()
+                os.fsync(fh.fileno())
+
+            lines: List[str] = []
+            for i, key in enumerate(pending):
+                lines.append(f"{key}\t{start + i}\n")
+            with open(self._index_path, "a+b") as fh:
+                # Drop a line left half-written by a dead writer
+                fh.truncate(_last_line_end(fh))
+                fh.seek(0, os.SEEK_END)
+                fh.write("".join(lines).encode("ascii"))
+                fh.flush()
+                os.fsync(fh.fileno())
+
+            self._refresh_index()
+            return len(pending)
+
+
+def _last_line_end(fh, block: int = 4096) -> int:
+    """Offset just past the last newline in ``fh``, or 0 if there is none."""
+    end = fh.seek(0, os.SEEK_END)
+    while end > 0:
+        start = max(0, end - block)
+        fh.seek(start)
+        pos = fh.read(end - start).rfind(b"\n")
+        if pos >= 0:
+            return start + pos + 1
+        end = start
+    return 0
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app import config
+from app.imports import lazy_import
+from app.services.embedding_store import file_lock
+from app.services.jobs import fetch_jobs
+from app.services.packed_embeddings import PackedKeywordMatrix
+from app.services.pools import run_cpu, run_io
+from app.services.scoring import SimpleModel, encoder_info, get_embedding_model, top_k_indices
+
+np = lazy_import("numpy")
+
+
+def job_text(job: Dict[str, Any]) -> str:
+    return (job.get("title", "") + "\n" + job.get("description", ""))[:4000]
+
+
+def encode_job_texts(texts: List[str]) -> np.ndarray:
+    return np.asarray(get_embedding_model().encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+
+def encode_resume(resume_text: str) -> np.ndarray:
+    return np.asarray(get_embedding_model().encode([resume_text], normalize_embeddings=True)[0], dtype=np.float32)
+
+
+# Quoted so defining the alias does not import numpy
+Rows = Union["np.ndarray", PackedKeywordMatrix]
+
+_DENSE_FILE = "embeddings.npy"
+_PACKED_FILE = "embeddings.packed.npz"
+_LOCK_FILE = ".lock"
+
+
+class JobCorpus:
+    """Local postings with precomputed embeddings and top-k vector search.
+
+    Postings are unique by URL and each is encoded exactly once, when it is
+    added. Rows live in a preallocated float32 matrix that grows by doubling;
+    searches work on a snapshot of the filled rows, so adding postings never
+    disturbs a search running on another thread. With ``packed`` (keyword
+    model only) rows are held as a ``PackedKeywordMatrix`` instead.
+    """
+
+    def __init__(self, dim: int, max_jobs: int, directory: str = "", model_id: str = "", packed: bool = False):
+        self.dim = dim
+        self.max_jobs = max_jobs
+        self.directory = directory
+        self.model_id = model_id
+        self.packed = packed
+        self._lock = threading.Lock()
+        self._jobs: List[Dict[str, Any]] = []
+        self._row_by_url: Dict[str, int] = {}
+        self._matrix = self._empty(0)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _empty(self, rows: int) -> Rows:
+        if self.packed:
+            return PackedKeywordMatrix.zeros(rows)
+        return np.zeros((rows, self.dim), dtype=np.float32)
+
+    def snapshot(self) -> Tuple[List[Dict[str, Any]], Rows]:
+        with self._lock:
+            return self._jobs, self._matrix[: self._size]
+
+    def new_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Postings whose URL is not in the corpus yet, deduplicated."""
+        out: List[Dict[str, Any]] = []
+        seen = set()
+        for job in jobs:
+            url = job.get("url")
+            if not url or url == "#" or url in seen or url in self._row_by_url:
+                continue
+            seen.add(url)
+            out.append(job)
+        return out
+
+    def add(self, jobs: List[Dict[str, Any]], embeddings: Rows) -> int:
+        """Add postings with their dense or packed embeddings (one row per posting)."""
+        with self._lock:
+            keep = [i for i, j in enumerate(jobs) if j.get("url") not in self._row_by_url]
+            if not keep:
+                return 0
+            keep = keep[-self.max_jobs:]
+            if self._size + len(keep) > self.max_jobs:
+                self._compact(self.max_jobs - len(keep))
+
+            needed = self._size + len(keep)
+            if needed > len(self._matrix):
+                capacity = max(needed, 2 * len(self._matrix), 1024)
+                grown = self._empty(capacity)
+                grown[: self._size] = self._matrix[: self._size]
+                self._matrix = grown
+
+            rows = embeddings[np.asarray(keep)]
+            if not self.packed and isinstance(rows, PackedKeywordMatrix):
+                rows = rows.to_dense()
+            self._matrix[self._size : needed] = rows
+            for i in keep:
+                self._row_by_url[jobs[i]["url"]] = self._size
+                self._jobs.append(jobs[i])
+                self._size += 1
+            return len(keep)
+
+    def _compact(self, keep: int) -> None:
+        # Drop the oldest postings; builds new objects so live snapshots stay valid
+        start = self._size - max(0, keep)
+        self._jobs = self._jobs[start:]
+        matrix = self._empty(max(keep, 1024))
+        matrix[:keep] = self._matrix[start : self._size]
+        self._matrix = matrix
+        self._size = len(self._jobs)
+        self._row_by_url = {j["url"]: i for i, j in enumerate(self._jobs)}
+
+    def search(self, query_emb: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        jobs, matrix = self.snapshot()
+        if not len(jobs) or top_k <= 0:
+            return []
+        # Packed rows score with popcounts of the keyword bits, see PackedKeywordMatrix
+        scores = matrix.dot(query_emb.astype(np.float32))
+        results = []
+        for i in top_k_indices(scores, top_k):
+            job = dict(jobs[i])
+            job["score"] = float(max(0.0, min(1.0, scores[i])))
+            results.append(job)
+        return results
+
+    def save(self) -> None:
+        """Write the corpus files; other processes load them as a consistent set.
+
+        Each file is written under a per-process temporary name and the three
+        renames happen under the directory's file lock, which ``load`` also
+        takes, so a reader never pairs postings with another save's rows.
+        """
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        jobs, matrix = self.snapshot()
+        jobs_path = os.path.join(self.directory, "jobs.jsonl")
+        emb_path = os.path.join(self.directory, _PACKED_FILE if self.packed else _DENSE_FILE)
+        meta_path = os.path.join(self.directory, "meta.json")
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        written = []
+        try:
+            with open(jobs_path + suffix, "w", encoding="utf-8") as fh:
+                written.append(jobs_path)
+                for job in jobs[: len(matrix)]:
+                    fh.write(json.dumps(job) + "\n")
+            with open(emb_path + suffix, "wb") as fh:
+                written.append(emb_path)
+                if self.packed:
+                    np.savez(fh, bits=matrix.bits, scale=matrix.scale, features=matrix.features)
+                else:
+                    np.save(fh, matrix)
+            with open(meta_path + suffix, "w", encoding="utf-8") as fh:
+                written.append(meta_path)
+                json.dump(
+                    {"model_id": self.model_id, "dim": self.dim, "jobs": len(matrix), "packed": self.packed}, fh
+                )
+            with file_lock(os.path.join(self.directory, _LOCK_FILE)):
+                for path in written:
+                    os.replace(path + suffix, path)
+        finally:
+            for path in written:
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def load(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """Load a saved corpus: postings added, and postings left to encode.
+
+        Saved embeddings are only reused for the same model; otherwise all
+        postings come back for the caller to encode off this process, see
+        ``run_ingestion``.
+        """
+        if not self.directory:
+            return 0, []
+        jobs_path = os.path.join(self.directory, "jobs.jsonl")
+        meta_path = os.path.join(self.directory, "meta.json")
+        if not (os.path.exists(jobs_path) and os.path.exists(meta_path)):
+            return 0, []
+        embeddings = None
+        with file_lock(os.path.join(self.directory, _LOCK_FILE)):
+            with open(meta_path, "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with open(jobs_path, "r", encoding="utf-8") as fh:
+                jobs = [json.loads(line) for line in fh if line.strip()]
+            emb_path = os.path.join(self.directory, _PACKED_FILE if meta.get("packed") else _DENSE_FILE)
+            if meta.get("model_id") == self.model_id and meta.get("dim") == self.dim and os.path.exists(emb_path):
+                if meta.get("packed"):
+                    with np.load(emb_path) as saved:
+                        embeddings = PackedKeywordMatrix(saved["bits"], saved["scale"], saved["features"])
+                else:
+                    embeddings = np.load(emb_path)
+        if embeddings is None or len(embeddings) != len(jobs):
+            return 0, jobs
+        return self.add(jobs, embeddings), []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": self._size,
+            "capacity": len(self._matrix),
+            "max_jobs": self.max_jobs,
+            "packed": self.packed,
+            "embedding_bytes": int(self._matrix.nbytes),
+        }
+
+
+_corpus: Optional[JobCorpus] = None
+
+
+async def get_job_corpus() -> Optional[JobCorpus]:
+    """The process-wide corpus, or None when FATIRESUME_JOB_CORPUS is off."""
+    global _corpus
+    if not config.JOB_CORPUS_ENABLED:
+        return None
+    if _corpus is None:
+        model_id, dim = await encoder_info()
+        if _corpus is None:
+            _corpus = JobCorpus(
+                dim=dim,
+                max_jobs=config.JOB_CORPUS_MAX_JOBS,
+                directory=config.JOB_CORPUS_DIR,
+                model_id=model_id,
+                packed=config.JOB_CORPUS_PACKED and model_id == SimpleModel.model_id,
+            )
+    return _corpus
+
+
+async def ingest(corpus: JobCorpus, queries: List[str]) -> int:
+    """Fetch postings for ``queries`` from the providers and add the new ones."""
+    added = 0
+    for query in queries:
+        fetched = await fetch_jobs(query, limit=config.JOB_CORPUS_FETCH_LIMIT)
+        fresh = corpus.new_jobs(fetched)
+        if not fresh:
+            continue
+        embeddings = await run_cpu(encode_job_texts, [job_text(j) for j in fresh])
+        added += corpus.add(fresh, embeddings)
+    if added:
+        await run_io(corpus.save)
+    return added
+
+
+async def run_ingestion() -> None:
+    """Load the saved corpus, then refresh it from the providers periodically."""
+    corpus = await get_job_corpus()
+    if corpus is None:
+        return
+    loaded, stale = await run_io(corpus.load)
+    if stale:
+        # Saved for another model: encoded on the CPU pool like fresh postings
+        embeddings = await run_cpu(encode_job_texts, [job_text(j) for j in stale])
+        loaded += corpus.add(stale, embeddings)
+    if loaded:
+        print(f"Job corpus loaded {loaded} postings")
+    while True:
+        try:
+            added = await ingest(corpus, config.JOB_CORPUS_QUERIES)
+            print(f"Job corpus ingested {added} new postings ({len(corpus)} total)")
+        except Exception as e:
+            print(f"Job corpus ingestion failed: {e!r}")
+        await asyncio.sleep(config.JOB_CORPUS_REFRESH_SECONDS)
+
+
+async def search_corpus(corpus: JobCorpus, resume_text: str, top_k: int) -> List[Dict[str, Any]]:
+    resume_emb = await run_cpu(encode_resume, resume_text)
+    return await run_io(corpus.search, resume_emb, top_k)
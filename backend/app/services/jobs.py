@@ -1,10 +1,46 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
-import requests
+from app import config
+from app.imports import lazy_import
+from app.services import metrics
+from app.services.pools import run_cpu
+from app.services.query_cache import AsyncTTLCache, normalize_query
+from app.services.scoring import extract_skills, get_embedding_model, top_k_indices
 
-from app.services.scoring import cosine_sim, extract_skills, get_embedding_model
+httpx = lazy_import("httpx")
+np = lazy_import("numpy")
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for job board requests on the running loop."""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=config.JOB_PROVIDER_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=config.JOB_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.JOB_HTTP_MAX_CONNECTIONS,
+            ),
+            follow_redirects=True,
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client, _http_client_loop
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _http_client_loop = None
 
 
 def _safe_text(value: Any) -> str:
@@ -15,9 +51,9 @@ def _safe_text(value: Any) -> str:
     return str(value)
 
 
-def _remotive_search(query: str, limit: int) -> List[Dict[str, Any]]:
-    url = "https://remotive.com/api/remote-jobs"
-    r = requests.get(url, params={"search": query}, timeout=30)
+async def _remotive_search(client: httpx.AsyncClient, query: str, limit: int) -> List[Dict[str, Any]]:
+    url = config.REMOTIVE_URL
+    r = await client.get(url, params={"search": query})
     r.raise_for_status()
     payload = r.json()
     jobs = payload.get("jobs", []) or []
@@ -36,9 +72,9 @@ def _remotive_search(query: str, limit: int) -> List[Dict[str, Any]]:
     return out
 
 
-def _arbeitnow_search(query: str, limit: int) -> List[Dict[str, Any]]:
-    url = "https://www.arbeitnow.com/api/job-board-api"
-    r = requests.get(url, params={"search": query}, timeout=30)
+async def _arbeitnow_search(client: httpx.AsyncClient, query: str, limit: int) -> List[Dict[str, Any]]:
+    url = config.ARBEITNOW_URL
+    r = await client.get(url, params={"search": query})
     r.raise_for_status()
     payload = r.json()
     jobs = payload.get("data", []) or []
@@ -66,40 +102,53 @@ def build_job_query(resume_text: str, query: Optional[str]) -> str:
     return "machine learning"
 
 
-def rank_jobs(resume_text: str, jobs: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
-    model = get_embedding_model()
-    resume_emb = model.encode([resume_text], normalize_embeddings=True)[0]
+def dedup_jobs(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """First posting per URL and per normalized title + company; postings without a URL are dropped.
 
-    texts = []
-    for j in jobs:
-        texts.append((j.get("title", "") + "\n" + j.get("description", ""))[:4000])
+    Runs before encoding, so a later duplicate is dropped unscored even
+    when it would have ranked higher than the copy that is kept.
+    """
+    out: List[Dict[str, Any]] = []
+    seen_urls = set()
+    seen_roles = set()
+    for job in jobs:
+        url = job.get("url")
+        if not url or url in seen_urls:
+            continue
+        role = (normalize_query(job.get("title") or ""), normalize_query(job.get("company") or ""))
+        if role in seen_roles:
+            continue
+        seen_urls.add(url)
+        if any(role):
+            seen_roles.add(role)
+        out.append(job)
+    return out
 
-    if not texts:
-        return []
 
-    job_embs = model.encode(texts, normalize_embeddings=True)
+def rank_jobs(resume_text: str, jobs: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    with metrics.span("jobs.rank"):
+        return _rank_jobs(resume_text, jobs, top_k)
 
-    scored: List[Dict[str, Any]] = []
-    for j, emb in zip(jobs, job_embs):
-        score = cosine_sim(resume_emb, emb)
-        j2 = dict(j)
-        j2["score"] = float(max(0.0, min(1.0, score)))
-        scored.append(j2)
 
-    scored.sort(key=lambda x: x.get("score", 0.0), reverse=True)
+def _rank_jobs(resume_text: str, jobs: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    # Duplicates are dropped before anything is encoded
+    jobs = dedup_jobs(jobs)
+    if not jobs or top_k <= 0:
+        return []
 
-    dedup: List[Dict[str, Any]] = []
-    seen_urls = set()
-    for j in scored:
-        url = j.get("url")
-        if not url or url in seen_urls:
-            continue
-        seen_urls.add(url)
-        dedup.append(j)
-        if len(dedup) >= top_k:
-            break
+    model = get_embedding_model()
+    resume_emb = np.asarray(model.encode([resume_text], normalize_embeddings=True)[0], dtype=np.float32)
+    job_embs = np.asarray(
+        model.encode([(j.get("title", "") + "\n" + j.get("description", ""))[:4000] for j in jobs], normalize_embeddings=True),
+        dtype=np.float32,
+    )
 
-    return dedup
+    # Cosine similarity of every posting in one matrix-vector product
+    denom = np.linalg.norm(job_embs, axis=1) * np.linalg.norm(resume_emb)
+    scores = np.divide(job_embs @ resume_emb, denom, out=np.zeros(len(jobs), dtype=np.float32), where=denom != 0)
+    scores = np.clip(scores, 0.0, 1.0)
+
+    return [dict(jobs[i], score=float(scores[i])) for i in top_k_indices(scores, top_k)]
 
 
 def _backup_jobs(query: str, limit: int) -> List[Dict[str, Any]]:
@@ -173,30 +222,77 @@ def _backup_jobs(query: str, limit: int) -> List[Dict[str, Any]]:
     return backup_jobs[:limit]
 
 
-def find_jobs(resume_text: str, query: Optional[str], top_k: int = 10) -> List[Dict[str, Any]]:
-    q = build_job_query(resume_text=resume_text, query=query)
+_PROVIDERS: List[Callable[[httpx.AsyncClient, str, int], Awaitable[List[Dict[str, Any]]]]] = [
+    _remotive_search,
+    _arbeitnow_search,
+]
 
-    jobs: List[Dict[str, Any]] = []
-    
-    # Try external APIs but ensure we always have backup
+
+# Provider results keyed by (provider, normalized query, limit); callers must not mutate them
+search_cache = AsyncTTLCache(
+    ttl=config.JOB_CACHE_TTL,
+    stale_ttl=config.JOB_CACHE_STALE_TTL,
+    max_entries=config.JOB_CACHE_MAX_ENTRIES,
+    name="job_search",
+)
+
+
+def _provider_name(fetch) -> str:
+    return fetch.__name__.strip("_").replace("_search", "")
+
+
+async def _timed_fetch(fetch, client: httpx.AsyncClient, query: str, limit: int) -> List[Dict[str, Any]]:
+    start = time.perf_counter()
+    try:
+        return await fetch(client, query, limit)
+    finally:
+        metrics.observe("fatiresume_provider_request_seconds", time.perf_counter() - start, provider=_provider_name(fetch))
+
+
+async def _fetch_provider(fetch, client: httpx.AsyncClient, query: str, limit: int) -> List[Dict[str, Any]]:
+    query = normalize_query(query)
     try:
-        for fetch in (_remotive_search, _arbeitnow_search):
-            try:
-                external_jobs = fetch(q, limit=top_k)
-                # Validate external jobs have required fields
-                for job in external_jobs:
-                    if all(key in job for key in ["title", "url", "description"]):
-                        jobs.append(job)
-            except Exception as e:
-                print(f"External API failed: {e}")
-                continue
+        external_jobs = await asyncio.wait_for(
+            search_cache.get_or_fetch((fetch.__name__, query, limit), lambda: _timed_fetch(fetch, client, query, limit)),
+            timeout=config.JOB_PROVIDER_TIMEOUT,
+        )
     except Exception as e:
-        print(f"All external APIs failed: {e}")
+        print(f"External API failed: {fetch.__name__}: {e!r}")
+        if isinstance(e, asyncio.TimeoutError):
+            reason = "timeout"
+        elif isinstance(e, httpx.HTTPStatusError):
+            reason = "status"
+        else:
+            reason = "error"
+        metrics.inc("fatiresume_provider_errors_total", provider=_provider_name(fetch), reason=reason)
+        return []
+    # Validate external jobs have required fields
+    return [job for job in external_jobs if all(key in job for key in ["title", "url", "description"])]
+
+
+async def fetch_jobs(query: str, limit: int) -> List[Dict[str, Any]]:
+    """Query every provider concurrently and keep whatever arrives within the budget."""
+    client = get_http_client()
+    tasks = [asyncio.ensure_future(_fetch_provider(fetch, client, query, limit)) for fetch in _PROVIDERS]
+    _, pending = await asyncio.wait(tasks, timeout=config.JOB_SEARCH_BUDGET)
+    for fetch, task in zip(_PROVIDERS, tasks):
+        if task in pending:
+            print("External API skipped: search budget exceeded")
+            metrics.inc("fatiresume_provider_errors_total", provider=_provider_name(fetch), reason="budget")
+            task.cancel()
+
+    jobs: List[Dict[str, Any]] = []
+    for task in tasks:
+        if task.done() and not task.cancelled():
+            jobs.extend(task.result())
+    return jobs
 
+
+def select_jobs(jobs: List[Dict[str, Any]], query: str, top_k: int) -> List[Dict[str, Any]]:
     # Always use backup data to ensure reliability
     if not jobs or len(jobs) < 3:
         print("Using backup job data for reliability")
-        jobs = _backup_jobs(q, top_k)
+        jobs = _backup_jobs(query, top_k)
 
     # Ensure all jobs have required fields
     valid_jobs = []
@@ -210,5 +306,15 @@ def find_jobs(resume_text: str, query: Optional[str], top_k: int = 10) -> List[D
             "source": job.get("source", "job_board")
         }
         valid_jobs.append(valid_job)
+    return valid_jobs
+
+
+async def find_jobs(resume_text: str, query: Optional[str], top_k: int = 10) -> List[Dict[str, Any]]:
+    q = build_job_query(resume_text=resume_text, query=query)
+
+    # Try external APIs but ensure we always have backup
+    with metrics.span("jobs.fetch"):
+        jobs = await fetch_jobs(q, limit=top_k)
+    valid_jobs = select_jobs(jobs, q, top_k)
 
-    return rank_jobs(resume_text=resume_text, jobs=valid_jobs, top_k=top_k)
+    return await run_cpu(rank_jobs, resume_text=resume_text, jobs=valid_jobs, top_k=top_k)
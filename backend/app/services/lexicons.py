@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import config
+from app.services.matcher import Matcher, compile_matcher
+
+# Bump when the pickled compiled form changes so stale disk caches are ignored
+_COMPILED_FORMAT = "2"
+
+BUNDLED_LEXICON_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "lexicons")
+_BIAS_FILE = "bias.json"
+_SKILLS_FILE = "skills.json"
+
+
+class Lexicons:
+    """Bias and skill lexicons with their compiled matchers.
+
+    Instances are never mutated after loading, so swapping the current one
+    is a single reference assignment and each request sees one version.
+    Terms are lowercased; matching is case-insensitive.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        bias_categories: Dict[str, Dict[str, str]],
+        skills: Tuple[str, ...],
+        bias_matcher: Optional[Matcher] = None,
+        skill_matcher: Optional[Matcher] = None,
+        source: str = "",
+    ):
+        self.version = version
+        self.bias_categories = bias_categories
+        self.skills = skills
+        self.source = source
+        self.bias_matcher = bias_matcher or compile_matcher(
+            term for terms in bias_categories.values() for term in terms
+        )
+        self.skill_matcher = skill_matcher or compile_matcher(skills)
+        self._skill_rank = {skill: i for i, skill in enumerate(skills)}
+
+    def skills_in(self, text: str) -> List[str]:
+        """Skills found in ``text``, in lexicon order."""
+        return sorted(self.skill_matcher.found(text), key=self._skill_rank.__getitem__)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "bias_terms": sum(len(terms) for terms in self.bias_categories.values()),
+            "bias_categories": list(self.bias_categories),
+            "skills": len(self.skills),
+        }
+
+
+def _read_bias(raw: bytes) -> Dict[str, Dict[str, str]]:
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError(f"{_BIAS_FILE} must map categories to {{term: message}} objects")
+    categories: Dict[str, Dict[str, str]] = {}
+    for category, terms in data.items():
+        if not isinstance(terms, dict) or not all(isinstance(m, str) for m in terms.values()):
+            raise ValueError(f"{_BIAS_FILE}: category {category!r} must map terms to messages")
+        categories[category] = {term.lower(): message for term, message in terms.items() if term.strip()}
+    return categories
+
+
+def _read_skills(raw: bytes) -> Tuple[str, ...]:
+    data = json.loads(raw)
+    if not isinstance(data, list) or not all(isinstance(s, str) for s in data):
+        raise ValueError(f"{_SKILLS_FILE} must be a list of skills")
+    return tuple(dict.fromkeys(s.lower() for s in data if s.strip()))
+
+
+def _compiled_path(cache_dir: str, version: str) -> str:
+    return os.path.join(cache_dir, f"lexicons-{version}.pickle")
+
+
+def load_lexicons(directory: str, cache_dir: str = "") -> Lexicons:
+    """Read and compile the lexicon files in ``directory``.
+
+    The version is a hash of the file contents. With ``cache_dir`` the
+    compiled matchers are stored there per version and reused on the next
+    load, including by other worker processes.
+    """
+    with open(os.path.join(directory, _BIAS_FILE), "rb") as fh:
+        bias_raw = fh.read()
+    with open(os.path.join(directory, _SKILLS_FILE), "rb") as fh:
+        skills_raw = fh.read()
+
+    h = hashlib.sha256()
+    h.update(_COMPILED_FORMAT.encode("ascii"))
+    h.update(b"\x00")
+    h.update(bias_raw)
+    h.update(b"\x00")
+    h.update(skills_raw)
+    version = h.hexdigest()[:16]
+
+    try:
+        categories = _read_bias(bias_raw)
+        skills = _read_skills(skills_raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid lexicon JSON in {directory}: {e}")
+
+    compiled = None
+    if cache_dir:
+        try:
+            with open(_compiled_path(cache_dir, version), "rb") as fh:
+                compiled = pickle.load(fh)
+        except FileNotFoundError:
+            compiled = None
+        except Exception as e:
+            # Any unreadable pickle (truncated, or from another code version) is a miss
+            print(f"Lexicon cache read failed: {e!r}")
+            compiled = None
+
+    lexicons = Lexicons(
+        version,
+        categories,
+        skills,
+        bias_matcher=compiled[0] if compiled else None,
+        skill_matcher=compiled[1] if compiled else None,
+        source=directory,
+    )
+
+    if cache_dir and compiled is None:
+        path = _compiled_path(cache_dir, version)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as fh:
+                pickle.dump((lexicons.bias_matcher, lexicons.skill_matcher), fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Lexicon cache write failed: {e!r}")
+    return lexicons
+
+
+def _lexicon_dir() -> str:
+    return config.LEXICON_DIR or BUNDLED_LEXICON_DIR
+
+
+def _signature(directory: str) -> Tuple[Tuple[int, int], ...]:
+    out = []
+    for name in (_BIAS_FILE, _SKILLS_FILE):
+        try:
+            st = os.stat(os.path.join(directory, name))
+            out.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append((0, 0))
+    return tuple(out)
+
+
+_lock = threading.Lock()
+_current: Optional[Lexicons] = None
+_current_signature: Optional[Tuple[Tuple[int, int], ...]] = None
+_next_check = 0.0
+# Last version passed to sync_version, so a mismatch reloads only once
+_synced_for = ""
+
+
+def reload_lexicons() -> Lexicons:
+    """Load the lexicon files and make them current.
+
+    Raises ``OSError`` or ``ValueError`` and keeps the current lexicons if
+    the files are missing or invalid.
+    """
+    global _current, _current_signature
+    directory = _lexicon_dir()
+    with _lock:
+        signature = _signature(directory)
+        lexicons = load_lexicons(directory, config.LEXICON_CACHE_DIR)
+        _current, _current_signature = lexicons, signature
+    return lexicons
+
+
+def get_lexicons() -> Lexicons:
+    """The current lexicons, reloaded when their files change.
+
+    Files are checked at most every ``FATIRESUME_LEXICON_CHECK_SECONDS``;
+    CPU pool workers also follow the API process through ``sync_version``.
+    """
+    global _current_signature, _next_check
+    current = _current
+    if current is None:
+        return reload_lexicons()
+    if config.LEXICON_CHECK_SECONDS <= 0 or time.monotonic() < _next_check:
+        return current
+
+    _next_check = time.monotonic() + config.LEXICON_CHECK_SECONDS
+    signature = _signature(_lexicon_dir())
+    if signature == _current_signature:
+        return current
+    try:
+        return reload_lexicons()
+    except (OSError, ValueError) as e:
+        # Keep serving the last good version until the files are fixed
+        print(f"Lexicon reload failed: {e!r}")
+        _current_signature = signature
+        return current
+
+
+def current_version() -> str:
+    """Version of the lexicons loaded in this process, ``""`` before the first load."""
+    current = _current
+    return current.version if current is not None else ""
+
+
+def sync_version(version: str) -> None:
+    """Reload the lexicon files if this process holds another version than ``version``.
+
+    ``pools.run_cpu`` calls this in the worker with the API process's
+    version, so a reload through the API reaches every worker with its
+    next task, even with file checks off. Each requested version triggers
+    at most one reload; a failed one keeps the current lexicons.
+    """
+    global _synced_for
+    current = _current
+    if not version or version == _synced_for or (current is not None and current.version == version):
+        return
+    _synced_for = version
+    try:
+        reload_lexicons()
+    except (OSError, ValueError) as e:
+        print(f"Lexicon reload failed: {e!r}")
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+# Below this many patterns one C-level substring search per pattern beats
+# the automaton's per-character Python loop on resume-sized texts
+AUTOMATON_MIN_PATTERNS = 200
+
+
+def _is_word(ch: str) -> bool:
+    # Same notion of a word character as \w in a str regex
+    return ch.isalnum() or ch == "_"
+
+
+@dataclass(frozen=True)
+class KeywordMatches:
+    """Start offsets of every pattern found in a (lowercased) text."""
+
+    offsets: Dict[str, Tuple[int, ...]]
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.offsets
+
+    def found(self) -> List[str]:
+        return list(self.offsets)
+
+    def count(self, term: str) -> int:
+        # Non-overlapping occurrences, same as str.count
+        starts = self.offsets.get(term)
+        if not starts:
+            return 0
+        n = 0
+        next_free = 0
+        for start in starts:
+            if start >= next_free:
+                n += 1
+                next_free = start + len(term)
+        return n
+
+
+def _unique_patterns(patterns: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(p.lower() for p in patterns if p))
+
+
+class SubstringMatcher:
+    """Finds patterns with one ``str.find`` search per pattern.
+
+    Same results as ``KeywordAutomaton``, including overlapping matches;
+    the cost grows with the number of patterns, but each search runs in C,
+    so it is the faster choice for small lexicons.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: Tuple[str, ...] = _unique_patterns(patterns)
+
+    def _starts(self, lowered: str, pattern: str, whole_words: bool) -> Iterator[int]:
+        start = lowered.find(pattern)
+        while start >= 0:
+            if not whole_words or _on_boundaries(lowered, start, start + len(pattern)):
+                yield start
+            start = lowered.find(pattern, start + 1)
+
+    def scan(self, text: str, whole_words: bool = False) -> KeywordMatches:
+        lowered = text.lower()
+        offsets: Dict[str, Tuple[int, ...]] = {}
+        for pattern in self.patterns:
+            starts = tuple(self._starts(lowered, pattern, whole_words))
+            if starts:
+                offsets[pattern] = starts
+        return KeywordMatches(offsets=offsets)
+
+    def found(self, text: str, whole_words: bool = False) -> List[str]:
+        """Patterns occurring in ``text``, in pattern order; stops at the first match of each."""
+        lowered = text.lower()
+        if not whole_words:
+            return [pattern for pattern in self.patterns if pattern in lowered]
+        return [
+            pattern for pattern in self.patterns
+            if pattern in lowered and next(self._starts(lowered, pattern, True), None) is not None
+        ]
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton finding every pattern in one pass over the text.
+
+    Matching is plain substring matching on the lowercased text, like the
+    ``keyword in text.lower()`` checks it replaces. With ``whole_words`` a
+    match must also sit on word boundaries at both ends, like a
+    ``\\b<pattern>\\b`` regex search. Scanning cost depends on the text
+    length and the number of matches, not on the number of patterns.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: Tuple[str, ...] = _unique_patterns(patterns)
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[str]] = [[]]
+        for pattern in self.patterns:
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(pattern)
+
+        # Breadth-first failure links, folded into a full transition table so
+        # scanning never has to walk the failure chain.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict() for _ in goto]
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            outputs[state].extend(outputs[fail[state]])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._outputs: List[Tuple[str, ...]] = [tuple(o) for o in outputs]
+
+    def scan(self, text: str, whole_words: bool = False) -> KeywordMatches:
+        delta = self._delta
+        outputs = self._outputs
+        lowered = text.lower()
+        offsets: Dict[str, List[int]] = {}
+        state = 0
+        for i, ch in enumerate(lowered):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                for pattern in outputs[state]:
+                    start = i - len(pattern) + 1
+                    if whole_words and not _on_boundaries(lowered, start, i + 1):
+                        continue
+                    offsets.setdefault(pattern, []).append(start)
+        return KeywordMatches(offsets={p: tuple(v) for p, v in offsets.items()})
+
+    def found(self, text: str, whole_words: bool = False) -> List[str]:
+        """Patterns occurring in ``text``, in order of first match."""
+        return self.scan(text, whole_words).found()
+
+
+def _on_boundaries(text: str, start: int, end: int) -> bool:
+    before = start > 0 and _is_word(text[start - 1])
+    after = end < len(text) and _is_word(text[end])
+    return before != _is_word(text[start]) and _is_word(text[end - 1]) != after
+
+
+Matcher = Union[SubstringMatcher, KeywordAutomaton]
+
+
+def compile_matcher(patterns: Iterable[str]) -> Matcher:
+    """The faster matcher for a lexicon of this size."""
+    patterns = _unique_patterns(patterns)
+    if len(patterns) >= AUTOMATON_MIN_PATTERNS:
+        return KeywordAutomaton(patterns)
+    return SubstringMatcher(patterns)
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app import config
+
+# Histogram bucket upper bounds in seconds
+BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# name -> (type, help); rendered in this order
+METRICS: Dict[str, Tuple[str, str]] = {
+    "fatiresume_http_request_seconds": ("histogram", "HTTP request latency by route, including response serialization."),
+    "fatiresume_stage_seconds": ("histogram", "Time spent in each processing stage."),
+    "fatiresume_provider_request_seconds": ("histogram", "Job board request latency by provider."),
+    "fatiresume_provider_errors_total": ("counter", "Failed or skipped job board requests by provider and reason."),
+    "fatiresume_cache_requests_total": ("counter", "Cache lookups by cache and outcome."),
+    "fatiresume_parse_backend_total": ("counter", "Parsed resumes by the backend that produced the text."),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+# ("observe" | "inc", metric name, labels, value)
+Event = Tuple[str, str, Labels, float]
+
+
+class Registry:
+    """In-process histograms and counters, rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        # (name, labels) -> per-bucket counts (last one is +Inf), sum, count
+        self._histograms: Dict[Tuple[str, Labels], List[Any]] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        with self._lock:
+            hist = self._histograms.get((name, labels))
+            if hist is None:
+                hist = self._histograms[name, labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            hist[0][bisect.bisect_left(self.buckets, value)] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def inc(self, name: str, labels: Labels, value: float = 1.0) -> None:
+        with self._lock:
+            self._counters[name, labels] = self._counters.get((name, labels), 0.0) + value
+
+    def apply(self, events: List[Event]) -> None:
+        for kind, name, labels, value in events:
+            if kind == "observe":
+                self.observe(name, labels, value)
+            else:
+                self.inc(name, labels, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            histograms = {key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines: List[str] = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(self.buckets + (float("inf"),), counts):
+                        cumulative += n
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {total!r}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {count}")
+            else:
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        '{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+registry = Registry()
+
+# Events of the current pool task, shipped back to the parent by ``collect``
+_collector: contextvars.ContextVar[Optional[List[Event]]] = contextvars.ContextVar("metrics_collector", default=None)
+# Events of the current request, kept when it is being profiled
+_request_events: contextvars.ContextVar[Optional[List[Event]]] = contextvars.ContextVar("metrics_request", default=None)
+
+
+def recording() -> bool:
+    """Whether anything would keep a metric recorded now."""
+    return config.METRICS or _collector.get() is not None or _request_events.get() is not None
+
+
+def record(events: List[Event]) -> None:
+    """Apply events recorded elsewhere (a pool worker) to the registry and the current request."""
+    if config.METRICS:
+        registry.apply(events)
+    request_events = _request_events.get()
+    if request_events is not None:
+        request_events.extend(events)
+
+
+def _record(kind: str, name: str, labels: Labels, value: float) -> None:
+    events = _collector.get()
+    if events is not None:
+        events.append((kind, name, labels, value))
+        return
+    if config.METRICS:
+        if kind == "observe":
+            registry.observe(name, labels, value)
+        else:
+            registry.inc(name, labels, value)
+    request_events = _request_events.get()
+    if request_events is not None:
+        request_events.append((kind, name, labels, value))
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    if recording():
+        _record("observe", name, tuple(sorted(labels.items())), value)
+
+
+def inc(name: str, value: float = 1.0, **labels: str) -> None:
+    if recording():
+        _record("inc", name, tuple(sorted(labels.items())), value)
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        _record("observe", "fatiresume_stage_seconds", (("stage", self.stage),), time.perf_counter() - self.start)
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(stage: str):
+    """Context manager timing ``stage`` into ``fatiresume_stage_seconds``; a no-op when nothing records."""
+    if not recording():
+        return _NO_SPAN
+    return _Span(stage)
+
+
+def collect(fn: Callable[[], Any]) -> Tuple[Any, List[Event]]:
+    """Run ``fn`` in a pool worker and return its result with the metric events it recorded.
+
+    Worker processes have their own registry, so ``pools.run_cpu`` hands
+    the events to ``record`` in the parent instead.
+    """
+    events: List[Event] = []
+    token = _collector.set(events)
+    try:
+        return fn(), events
+    finally:
+        _collector.reset(token)
+
+
+@contextmanager
+def capture_request() -> Iterator[List[Event]]:
+    """Also keep every event of the enclosing request (its task and pool calls) in a list."""
+    events: List[Event] = []
+    token = _request_events.set(events)
+    try:
+        yield events
+    finally:
+        _request_events.reset(token)
+
+
+def stage_totals(events: List[Event]) -> Dict[str, Dict[str, float]]:
+    """Seconds and calls per stage in ``events``, in first-seen order."""
+    totals: Dict[str, Dict[str, float]] = {}
+    for kind, name, labels, value in events:
+        if kind == "observe" and name == "fatiresume_stage_seconds":
+            stage = dict(labels)["stage"]
+            entry = totals.setdefault(stage, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += value
+            entry["calls"] += 1
+    return totals
+
+
+def render() -> str:
+    return registry.render()
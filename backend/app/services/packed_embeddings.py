@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Any, Union
+
+from app.imports import lazy_import
+from app.services.scoring import SimpleModel
+
+np = lazy_import("numpy")
+
+_KEYWORDS = SimpleModel.keyword_slots
+_FEATURES = SimpleModel.feature_slots
+_BIT_WEIGHTS = None
+
+
+def _bit_weights() -> np.ndarray:
+    global _BIT_WEIGHTS
+    if _BIT_WEIGHTS is None:
+        _BIT_WEIGHTS = np.left_shift(np.uint32(1), np.arange(_KEYWORDS, dtype=np.uint32))
+    return _BIT_WEIGHTS
+
+
+class PackedKeywordMatrix:
+    """Rows of ``SimpleModel`` embeddings packed into a bitset and a few floats.
+
+    A normalized keyword-model row is ``s * [keyword bits, features, zeros]``:
+    every set keyword slot holds the same value ``s``. Each row keeps the
+    keyword slots as bits of one uint32, ``s`` and the scaled features as
+    float32: 24 bytes instead of 256 for the dense float32 row. The dot
+    product with a query of the same layout is
+    ``s_q * s_r * popcount(bits_q & bits_r) + features_q . features_r``.
+
+    Features are stored column-major, ``(features, rows)``, so scoring runs
+    a few long vector operations instead of a narrow matrix product.
+    Indexing returns views (slices) or copies (index arrays) like numpy;
+    assigning accepts dense rows, which are packed, or another packed matrix.
+    """
+
+    def __init__(self, bits: np.ndarray, scale: np.ndarray, features: np.ndarray):
+        self.bits = bits
+        self.scale = scale
+        self.features = features
+
+    @classmethod
+    def zeros(cls, n: int) -> "PackedKeywordMatrix":
+        return cls(
+            np.zeros(n, dtype=np.uint32),
+            np.zeros(n, dtype=np.float32),
+            np.zeros((_FEATURES, n), dtype=np.float32),
+        )
+
+    @classmethod
+    def from_dense(cls, matrix: np.ndarray) -> "PackedKeywordMatrix":
+        """Pack dense rows; raises ``ValueError`` for rows not in the keyword-model layout."""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != SimpleModel.dim:
+            raise ValueError(f"Expected rows of width {SimpleModel.dim}, got shape {matrix.shape}")
+        keywords = matrix[:, :_KEYWORDS]
+        present = keywords > 0
+        scale = keywords.max(axis=1, initial=0.0)
+        if (
+            np.any(matrix < 0)
+            or np.any(matrix[:, _KEYWORDS + _FEATURES:])
+            or not np.array_equal(keywords, np.where(present, scale[:, None], np.float32(0.0)))
+        ):
+            raise ValueError("Rows are not keyword-model embeddings")
+        bits = np.bitwise_or.reduce(np.where(present, _bit_weights(), np.uint32(0)), axis=1)
+        return cls(bits.astype(np.uint32), scale, np.ascontiguousarray(matrix[:, _KEYWORDS:_KEYWORDS + _FEATURES].T))
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes + self.scale.nbytes + self.features.nbytes
+
+    def __getitem__(self, index: Any) -> "PackedKeywordMatrix":
+        return PackedKeywordMatrix(self.bits[index], self.scale[index], self.features[:, index])
+
+    def __setitem__(self, index: Any, rows: Union["PackedKeywordMatrix", np.ndarray]) -> None:
+        if not isinstance(rows, PackedKeywordMatrix):
+            rows = PackedKeywordMatrix.from_dense(np.atleast_2d(rows))
+            if isinstance(index, (int, np.integer)):
+                rows = rows[0]
+        self.bits[index] = rows.bits
+        self.scale[index] = rows.scale
+        self.features[:, index] = rows.features
+
+    def to_dense(self) -> np.ndarray:
+        out = np.zeros((len(self), SimpleModel.dim), dtype=np.float32)
+        present = (self.bits[:, None] & _bit_weights()) != 0
+        out[:, :_KEYWORDS] = np.where(present, self.scale[:, None], np.float32(0.0))
+        out[:, _KEYWORDS:_KEYWORDS + _FEATURES] = self.features.T
+        return out
+
+    def dot(self, query: np.ndarray) -> np.ndarray:
+        """Dot product of every row with one dense keyword-model ``query``."""
+        q = PackedKeywordMatrix.from_dense(np.asarray(query, dtype=np.float32).reshape(1, -1))
+        scores = np.bitwise_count(self.bits & q.bits[0]).astype(np.float32)
+        scores *= q.scale[0]
+        scores *= self.scale
+        scores += q.features[:, 0] @ self.features
+        return scores
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def parse_cache_key(filename: str, content_sha256: str, parser_version: str) -> str:
+    """Key for an upload's content hash; the extension picks the parser so it is included."""
+    h = hashlib.sha256()
+    h.update(parser_version.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(os.path.splitext(filename.lower())[1].encode("utf-8"))
+    h.update(b"\x00")
+    h.update(content_sha256.encode("ascii"))
+    return h.hexdigest()
+
+
+class ParseCache:
+    """LRU cache of cleaned resume text, optionally persisted to a directory.
+
+    The in-memory part is bounded by entries and characters. On disk each
+    entry is one ``<key>.txt`` file written atomically, so several worker
+    processes can share the directory.
+    """
+
+    def __init__(self, max_entries: int, max_chars: int, directory: str = ""):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.directory = directory
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".txt")
+
+    def _remember(self, key: str, text: str) -> None:
+        if self.max_entries <= 0 or len(text) > self.max_chars:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._chars -= len(old)
+            self._data[key] = text
+            self._chars += len(text)
+            while len(self._data) > self.max_entries or self._chars > self.max_chars:
+                _, evicted = self._data.popitem(last=False)
+                self._chars -= len(evicted)
+                self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._data.get(key)
+            if text is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return text
+        if self.directory:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as fh:
+                    text = fh.read()
+            except OSError:
+                text = None
+            if text is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, text)
+                return text
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        if self.directory:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as fh:
+                    fh.write(text)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Parse cache write failed: {e!r}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._data),
+                "chars": self._chars,
+                "max_entries": self.max_entries,
+                "max_chars": self.max_chars,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": ((self.hits + self.disk_hits) / lookups) if lookups else 0.0,
+            }
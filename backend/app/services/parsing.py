@@ -1,10 +1,36 @@
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
+import os
+import re
 from io import BytesIO
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
-import pdfplumber
-from docx import Document
+from app import config
+from app.imports import ensure_loaded, lazy_import
+from app.services import metrics
+from app.services.parse_cache import ParseCache
+from app.services.pools import get_pdf_pool, run_cpu
+
+# Parser libraries load on first use; the fast PDF backend is optional,
+# pdfplumber always works
+pdfplumber = lazy_import("pdfplumber")
+docx = lazy_import("docx")
+pypdfium2 = lazy_import("pypdfium2", optional=True)
+
+# Bump whenever extraction or cleaning changes so cached text is not reused
+PARSER_VERSION = "2"
+
+parse_cache = ParseCache(
+    max_entries=config.PARSE_CACHE_MAX_ENTRIES,
+    max_chars=config.PARSE_CACHE_MAX_CHARS,
+    directory=config.PARSE_CACHE_DIR,
+)
+
+# Replacement, private-use and control characters: signs of a broken font
+# encoding in text-only extraction
+_GARBLED_RE = re.compile("[\ufffd\ue000-\uf8ff\x01-\x08\x0b\x0c\x0e-\x1f]")
 
 
 def _clean_text(text: str) -> str:
@@ -14,34 +40,191 @@ def _clean_text(text: str) -> str:
     return "\n".join(lines).strip()
 
 
-def parse_pdf_bytes(data: bytes) -> str:
-    with pdfplumber.open(BytesIO(data)) as pdf:
-        pages = []
-        for page in pdf.pages:
-            extracted = page.extract_text() or ""
-            if extracted:
-                pages.append(extracted)
+def _open_source(source: Union[str, bytes]):
+    # Paths are handed to the parsers directly so they read from the file
+    # themselves; raw bytes are wrapped without copying.
+    return source if isinstance(source, str) else BytesIO(source)
+
+
+def pdf_page_count(source: Union[str, bytes]) -> int:
+    with pdfplumber.open(_open_source(source)) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pdf_pages(source: Union[str, bytes], start: int, stop: int) -> List[str]:
+    with pdfplumber.open(_open_source(source)) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _page_ranges(n_pages: int, workers: int) -> List[Tuple[int, int]]:
+    chunk = -(-n_pages // workers)
+    return [(start, min(start + chunk, n_pages)) for start in range(0, n_pages, chunk)]
+
+
+def _parallel_pages(n_pages: int) -> bool:
+    return n_pages >= config.PDF_PARALLEL_MIN_PAGES and config.PDF_POOL_SIZE > 1
+
+
+def _pdfplumber_text(source: Union[str, bytes]) -> str:
+    with pdfplumber.open(_open_source(source)) as pdf:
+        n_pages = len(pdf.pages)
+        # Pool workers can't own a nested pool (it would block their exit),
+        # so there long documents stay serial; the API fans out itself.
+        if not _parallel_pages(n_pages) or multiprocessing.parent_process() is not None:
+            pages = []
+            for page in pdf.pages:
+                extracted = page.extract_text() or ""
+                if extracted:
+                    pages.append(extracted)
+            return _clean_text("\n".join(pages))
+
+    # Long documents: page ranges on the PDF pool, merged back in page order
+    pool = get_pdf_pool()
+    futures = [
+        pool.submit(extract_pdf_pages, source, start, stop)
+        for start, stop in _page_ranges(n_pages, config.PDF_POOL_SIZE)
+    ]
+    pages = [text for future in futures for text in future.result() if text]
     return _clean_text("\n".join(pages))
 
 
+def _pdfium_text(source: Union[str, bytes]) -> Tuple[str, int]:
+    pdf = pypdfium2.PdfDocument(source)
+    try:
+        pages = []
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return _clean_text("\n".join(pages)), len(pdf)
+    finally:
+        pdf.close()
+
+
+# Text-only PDF backends tried before pdfplumber: name -> (cleaned text, page count)
+FAST_PDF_EXTRACTORS: Dict[str, Callable[[Union[str, bytes]], Tuple[str, int]]] = {}
+if pypdfium2 is not None:
+    FAST_PDF_EXTRACTORS["pdfium"] = _pdfium_text
+
+
+def looks_extracted(text: str, n_pages: int) -> bool:
+    """Quality check for fast-path text; False sends the PDF to pdfplumber."""
+    if len(text) < config.PDF_FAST_MIN_CHARS_PER_PAGE * max(1, n_pages):
+        return False
+    return len(_GARBLED_RE.findall(text)) <= config.PDF_FAST_MAX_GARBLED_RATIO * len(text)
+
+
+def _fast_pdf_text(source: Union[str, bytes]) -> Optional[Tuple[str, str]]:
+    for name in config.PDF_FAST_BACKENDS:
+        extractor = FAST_PDF_EXTRACTORS.get(name)
+        if extractor is None:
+            continue
+        try:
+            with metrics.span(f"parsing.{name}"):
+                text, n_pages = extractor(source)
+        except Exception as e:
+            print(f"PDF backend {name} failed: {e!r}")
+            continue
+        if looks_extracted(text, n_pages):
+            return text, name
+    return None
+
+
+def load_parser_libraries() -> None:
+    """Import the PDF and DOCX libraries now instead of on the first upload."""
+    for module in (pdfplumber, docx, pypdfium2):
+        if module is not None:
+            ensure_loaded(module)
+
+
+def _parse_pdf(source: Union[str, bytes]) -> Tuple[str, str]:
+    fast = _fast_pdf_text(source)
+    if fast is not None:
+        return fast
+    with metrics.span("parsing.pdfplumber"):
+        return _pdfplumber_text(source), "pdfplumber"
+
+
+def _parse_docx(source: Union[str, bytes]) -> str:
+    with metrics.span("parsing.docx"):
+        doc = docx.Document(_open_source(source))
+        parts = [p.text for p in doc.paragraphs if p.text]
+        return _clean_text("\n".join(parts))
+
+
+def parse_pdf_bytes(data: bytes) -> str:
+    return _parse_pdf(data)[0]
+
+
+def parse_pdf_file(path: str) -> str:
+    return _parse_pdf(path)[0]
+
+
 def parse_docx_bytes(data: bytes) -> str:
-    doc = Document(BytesIO(data))
-    parts = [p.text for p in doc.paragraphs if p.text]
-    return _clean_text("\n".join(parts))
+    return _parse_docx(data)
 
 
-def parse_resume(resume_text: Optional[str], filename: Optional[str], file_bytes: Optional[bytes]) -> str:
+def parse_docx_file(path: str) -> str:
+    return _parse_docx(path)
+
+
+def parse_resume_detailed(
+    resume_text: Optional[str],
+    filename: Optional[str],
+    file_bytes: Optional[bytes] = None,
+    file_path: Optional[str] = None,
+) -> Tuple[str, str]:
+    """``parse_resume`` plus the backend that produced the text."""
     if resume_text and resume_text.strip():
-        return _clean_text(resume_text)
+        with metrics.span("parsing.text"):
+            return _clean_text(resume_text), "text"
 
-    if not file_bytes or not filename:
-        return ""
+    source: Union[str, bytes, None] = file_path if file_path and os.path.getsize(file_path) else file_bytes
+    if not source or not filename:
+        return "", "none"
 
     lower = filename.lower()
     if lower.endswith(".pdf"):
-        return parse_pdf_bytes(file_bytes)
+        return _parse_pdf(source)
 
     if lower.endswith(".docx"):
-        return parse_docx_bytes(file_bytes)
+        return _parse_docx(source), "docx"
 
     raise ValueError("Unsupported file type. Please upload a .pdf or .docx")
+
+
+def parse_resume(
+    resume_text: Optional[str],
+    filename: Optional[str],
+    file_bytes: Optional[bytes] = None,
+    file_path: Optional[str] = None,
+) -> str:
+    return parse_resume_detailed(resume_text, filename, file_bytes=file_bytes, file_path=file_path)[0]
+
+
+async def parse_resume_file(filename: str, file_path: str) -> Tuple[str, str]:
+    """``parse_resume_detailed`` for an upload on disk, run on the CPU pool.
+
+    PDFs try the fast backends first. When pdfplumber is needed for a long
+    PDF, its page ranges run as separate CPU pool tasks and are merged back
+    in page order.
+    """
+    if filename.lower().endswith(".pdf") and os.path.getsize(file_path):
+        fast = await run_cpu(_fast_pdf_text, file_path)
+        if fast is not None:
+            return fast
+        with metrics.span("parsing.pdfplumber"):
+            n_pages = await run_cpu(pdf_page_count, file_path)
+            if _parallel_pages(n_pages):
+                chunks = await asyncio.gather(
+                    *(
+                        run_cpu(extract_pdf_pages, file_path, start, stop)
+                        for start, stop in _page_ranges(n_pages, config.PDF_POOL_SIZE)
+                    )
+                )
+                return _clean_text("\n".join(text for chunk in chunks for text in chunk if text)), "pdfplumber"
+            return await run_cpu(_pdfplumber_text, file_path), "pdfplumber"
+
+    return await run_cpu(parse_resume_detailed, resume_text=None, filename=filename, file_path=file_path)
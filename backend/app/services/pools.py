@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app import config
+from app.services import lexicons, metrics, profiling
+
+_lock = threading.Lock()
+_io_pool: Optional[ThreadPoolExecutor] = None
+_cpu_pool: Optional[Executor] = None
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _process_context():
+    # Forking an API process that already runs threads (the I/O pool, the
+    # event loop's executors) can copy a held lock into the child
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    """Bounded thread pool for blocking I/O such as job board requests."""
+    global _io_pool
+    with _lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(max_workers=max(1, config.IO_POOL_SIZE), thread_name_prefix="fatiresume-io")
+        return _io_pool
+
+
+def get_cpu_pool() -> Executor:
+    """Process pool for parsing and scoring.
+
+    With ``FATIRESUME_CPU_POOL_SIZE=0`` CPU work runs on the I/O thread pool
+    instead, which keeps one shared embedding cache per process.
+    """
+    global _cpu_pool
+    if config.CPU_POOL_SIZE <= 0:
+        return get_io_pool()
+    with _lock:
+        if _cpu_pool is None:
+            _cpu_pool = ProcessPoolExecutor(max_workers=config.CPU_POOL_SIZE, mp_context=_process_context())
+        return _cpu_pool
+
+
+def _replace_cpu_pool(broken: Executor) -> None:
+    """Drop ``broken`` so the next ``get_cpu_pool`` starts fresh workers.
+
+    Only the first caller to see a given broken pool replaces it; the
+    others find a newer pool already in place.
+    """
+    global _cpu_pool
+    with _lock:
+        if _cpu_pool is not broken:
+            return
+        _cpu_pool = None
+    print("CPU pool worker died; starting a new pool")
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for page-range PDF extraction when parsing is called directly.
+
+    The API fans page ranges out on the CPU pool instead, see
+    ``parsing.parse_resume_file``.
+    """
+    global _pdf_pool
+    with _lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=max(1, config.PDF_POOL_SIZE), mp_context=_process_context())
+        return _pdf_pool
+
+
+async def run_io(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), functools.partial(fn, *args, **kwargs))
+
+
+async def _run_on(pool: Executor, call: Callable[[], Any]) -> Any:
+    loop = asyncio.get_running_loop()
+    profile = profiling.current_profile()
+    if profile is not None:
+        result, events, stacks = await loop.run_in_executor(pool, profiling.profiled, call, profile.interval)
+        profile.add_stacks(stacks, root="cpu_pool")
+        metrics.record(events)
+        return result
+    if not metrics.recording():
+        return await loop.run_in_executor(pool, call)
+    # Metrics recorded in the worker come back with the result
+    result, events = await loop.run_in_executor(pool, metrics.collect, call)
+    metrics.record(events)
+    return result
+
+
+def _in_worker(call: Callable[[], Any], lexicon_version: str) -> Any:
+    lexicons.sync_version(lexicon_version)
+    return call()
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run ``fn`` on the CPU pool, with the lexicon version of this process.
+
+    A worker that dies (killed for memory, crashed in a native parser)
+    breaks the whole executor; the pool is then replaced and the call
+    retried once. ``BrokenProcessPool`` from the retry propagates, and
+    the API answers it with a 503.
+    """
+    call = functools.partial(_in_worker, functools.partial(fn, *args, **kwargs), lexicons.current_version())
+    pool = get_cpu_pool()
+    try:
+        return await _run_on(pool, call)
+    except BrokenProcessPool:
+        _replace_cpu_pool(pool)
+    return await _run_on(get_cpu_pool(), call)
+
+
+def shutdown_pools() -> None:
+    global _io_pool, _cpu_pool, _pdf_pool
+    with _lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False, cancel_futures=True)
+            _pdf_pool = None
+        if _cpu_pool is not None:
+            _cpu_pool.shutdown(wait=False, cancel_futures=True)
+            _cpu_pool = None
+        if _io_pool is not None:
+            _io_pool.shutdown(wait=False, cancel_futures=True)
+            _io_pool = None
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app import config
+from app.services import metrics
+
+Stack = Tuple[str, ...]
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's Python stack every ``interval`` seconds from a background thread.
+
+    Stacks are counted root first; ``stop_code`` cuts off the frames at and
+    above a known entry point (e.g. the pool machinery around a call).
+    """
+
+    def __init__(self, thread_id: int, interval: float, stop_code=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stop_code = stop_code
+        self.stacks: "Counter[Stack]" = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="fatiresume-profiler", daemon=True)
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        names: List[str] = []
+        while frame is not None and frame.f_code is not self.stop_code:
+            names.append(_frame_name(frame.f_code))
+            frame = frame.f_back
+        if names:
+            self.stacks[tuple(reversed(names))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> "Counter[Stack]":
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+def profiled(call: Callable[[], Any], interval: float) -> Tuple[Any, List[metrics.Event], "Counter[Stack]"]:
+    """Run ``call`` in a pool worker under a sampler; returns its result, metric events and stacks."""
+    sampler = StackSampler(threading.get_ident(), interval, stop_code=metrics.collect.__code__).start()
+    try:
+        result, events = metrics.collect(call)
+    finally:
+        stacks = sampler.stop()
+    return result, events, stacks
+
+
+class RequestProfile:
+    """Samples and stage timings of one profiled request.
+
+    The API process samples its event loop thread, which also runs any
+    other request in flight; CPU pool calls made for this request are
+    sampled in the worker and added under a ``cpu_pool`` root frame.
+    """
+
+    def __init__(self, path: str, interval: float):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.interval = interval
+        self.started = time.time()
+        self.duration = 0.0
+        self.stacks: "Counter[Stack]" = Counter()
+        self.events: List[metrics.Event] = []
+        self._start = time.perf_counter()
+        self._sampler: Optional[StackSampler] = None
+        self._lock = threading.Lock()
+
+    def start(self, events: List[metrics.Event]) -> None:
+        """Start sampling the calling (event loop) thread; stage events accumulate in ``events``."""
+        self.events = events
+        self._start = time.perf_counter()
+        self._sampler = StackSampler(threading.get_ident(), self.interval).start()
+
+    def finish(self) -> None:
+        """Stop sampling and store the profile; later calls do nothing."""
+        sampler, self._sampler = self._sampler, None
+        if sampler is None:
+            return
+        self.duration = time.perf_counter() - self._start
+        self.add_stacks(sampler.stop(), root="api")
+        profile_store.put(self.to_dict())
+
+    def elapsed(self) -> float:
+        return self.duration if self._sampler is None else time.perf_counter() - self._start
+
+    def add_stacks(self, stacks: "Counter[Stack]", root: str) -> None:
+        with self._lock:
+            for stack, count in stacks.items():
+                self.stacks[(root,) + stack] += count
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed-stack format read by flamegraph.pl and speedscope."""
+        with self._lock:
+            lines = [f"{';'.join(stack)} {count}" for stack, count in sorted(self.stacks.items())]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def stages(self) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: {"ms": round(total["seconds"] * 1000.0, 3), "calls": int(total["calls"])}
+            for stage, total in metrics.stage_totals(self.events).items()
+        }
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value: the request total, then each stage."""
+        parts = [f"total;dur={self.elapsed() * 1000.0:.3f}"]
+        parts.extend(f"{stage};dur={s['ms']:.3f}" for stage, s in self.stages().items())
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "path": self.path,
+            "started": self.started,
+            "duration_ms": round(self.duration * 1000.0, 3),
+            "interval_ms": self.interval * 1000.0,
+            "samples": sum(self.stacks.values()),
+            "stages": self.stages(),
+            "collapsed": self.collapsed(),
+        }
+
+
+_current: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+class ProfileStore:
+    """The most recent profiles in memory, optionally also written to ``directory``.
+
+    Each profile is saved as ``<id>.json`` and ``<id>.collapsed`` so other
+    worker processes, and flame graph tools, can read it.
+    """
+
+    def __init__(self, max_entries: int, directory: str = ""):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[profile["id"]] = profile
+            while len(self._data) > max(1, self.max_entries):
+                self._data.popitem(last=False)
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                base = os.path.join(self.directory, profile["id"])
+                with open(f"{base}.collapsed", "w", encoding="utf-8") as fh:
+                    fh.write(profile["collapsed"])
+                with open(f"{base}.json", "w", encoding="utf-8") as fh:
+                    json.dump(profile, fh)
+            except OSError as e:
+                print(f"Profile write failed: {e!r}")
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            profile = self._data.get(profile_id)
+        if profile is not None or not self.directory or not profile_id.isalnum():
+            return profile
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.json"), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+
+profile_store = ProfileStore(config.PROFILE_MAX_ENTRIES, config.PROFILE_DIR)
+
+
+@contextmanager
+def profile_request(path: str) -> Iterator[RequestProfile]:
+    """Profile the request handled inside the block.
+
+    The profile is stored by ``RequestProfile.finish``, which the caller may
+    invoke before the response is fully sent; leaving the block finishes it
+    otherwise.
+    """
+    profile = RequestProfile(path, max(0.0005, config.PROFILE_INTERVAL_MS / 1000.0))
+    token = _current.set(profile)
+    try:
+        with metrics.capture_request() as events:
+            profile.start(events)
+            try:
+                yield profile
+            finally:
+                profile.finish()
+    finally:
+        _current.reset(token)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.services import metrics
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class AsyncTTLCache:
+    """Async result cache with TTL, stale-while-revalidate and single-flight.
+
+    Fresh entries (younger than ``ttl``) are returned directly. Stale entries
+    (up to ``ttl + stale_ttl``) are returned at once while one background
+    refresh runs. Concurrent misses for the same key share one upstream call.
+    Failures are never cached. Lookups are counted in
+    ``fatiresume_cache_requests_total`` under ``name``.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int, name: str = "query"):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def _start(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> "asyncio.Future[Any]":
+        async def runner() -> Any:
+            try:
+                value = await fetch()
+                self._store(key, value)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(runner())
+        # Waiters may all have given up; don't warn about an unretrieved error
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
+
+    def _refresh_in_background(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._inflight:
+            return
+        self.refreshes += 1
+        task = self._start(key, fetch)
+
+        def done(t: "asyncio.Future[Any]") -> None:
+            if not t.cancelled() and t.exception() is not None:
+                self.refresh_errors += 1
+                print(f"Background refresh failed: {t.exception()!r}")
+
+        task.add_done_callback(done)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fetch()
+
+        entry = self._data.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                metrics.inc("fatiresume_cache_requests_total", cache=self.name, outcome="hit")
+                self._data.move_to_end(key)
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                metrics.inc("fatiresume_cache_requests_total", cache=self.name, outcome="stale_hit")
+                self._data.move_to_end(key)
+                self._refresh_in_background(key, fetch)
+                return entry[1]
+            del self._data[key]
+
+        task: Optional["asyncio.Future[Any]"] = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            metrics.inc("fatiresume_cache_requests_total", cache=self.name, outcome="coalesced")
+        else:
+            self.misses += 1
+            metrics.inc("fatiresume_cache_requests_total", cache=self.name, outcome="miss")
+            task = self._start(key, fetch)
+        # Shielded so a caller hitting its deadline doesn't cancel the shared fetch
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "hit_rate": ((self.hits + self.stale_hits) / lookups) if lookups else 0.0,
+        }
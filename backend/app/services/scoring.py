@@ -1,61 +1,129 @@
 from __future__ import annotations
 
+import os
 import re
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import List, Tuple
-
-import numpy as np
+from typing import List, Optional, Tuple
 
+from app import config
+from app.imports import lazy_import
 from app.api.schemas import Country, EvidenceItem, BiasReport, BiasFlag
+from app.services import metrics
 from app.services.country import CountryWeights, get_country_weights
 from app.services.bias import build_bias_report
+from app.services.embedding_cache import CachedEncoder, EmbeddingCache
+from app.services.embedding_store import EmbeddingStore
+from app.services.lexicons import get_lexicons
+from app.services.pools import run_cpu
+from app.services.sentence_encoder import SentenceTransformerModel
+
+np = lazy_import("numpy")
+
+
+_EMBEDDING_DIM = 64
+
+# Common tech keywords, one binary slot each at the start of the vector
+_EMBEDDING_KEYWORDS = (
+    'python', 'java', 'javascript', 'sql', 'aws', 'azure', 'gcp',
+    'docker', 'kubernetes', 'tensorflow', 'pytorch', 'sklearn',
+    'machine learning', 'deep learning', 'nlp', 'computer vision',
+    'data science', 'analytics', 'statistics', 'algorithms',
+    'react', 'nodejs', 'mongodb', 'postgresql', 'mysql',
+)
+
+# Counted words, scaled by 1/10, following the keyword slots
+_EMBEDDING_COUNTED = ('experience', 'project', 'skill')
+
+class SimpleModel:
+    """Simple model that doesn't require downloads"""
+
+    model_id = "keyword-64-v1"
+    dim = _EMBEDDING_DIM
+    # Vector layout: binary keyword slots, then length and counts, then zeros
+    keyword_slots = len(_EMBEDDING_KEYWORDS)
+    feature_slots = 1 + len(_EMBEDDING_COUNTED)
+
+    def encode(self, texts, normalize_embeddings=True):
+        # Keyword-based embedding, built for the whole batch at once
+        texts = list(texts)
+        n_keywords = len(_EMBEDDING_KEYWORDS)
+        result = np.zeros((len(texts), _EMBEDDING_DIM), dtype=np.float32)
+        lengths = np.empty(len(texts), dtype=np.float32)
+        counts = np.empty((len(texts), len(_EMBEDDING_COUNTED)), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            # Substring checks on one lowercased copy: each is a C-level
+            # search, cheaper than any per-character scan in Python
+            text_lower = text.lower()
+            result[row, :n_keywords] = [keyword in text_lower for keyword in _EMBEDDING_KEYWORDS]
+            lengths[row] = len(text)
+            counts[row] = [text_lower.count(word) for word in _EMBEDDING_COUNTED]
+
+        # Text-based features: length, then scaled word counts
+        result[:, n_keywords] = lengths / 1000.0
+        result[:, n_keywords + 1:n_keywords + 1 + len(_EMBEDDING_COUNTED)] = counts / 10.0
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(result, axis=1, keepdims=True)
+            result /= norms + 1e-8
+        return result
+
+
+def _load_encoder():
+    if config.EMBEDDING_BACKEND == "keyword":
+        return SimpleModel()
+    if config.EMBEDDING_BACKEND == "sentence-transformers":
+        return SentenceTransformerModel(
+            config.ST_MODEL,
+            batch_size=config.ST_BATCH_SIZE,
+            max_seq_length=config.ST_MAX_SEQ_LENGTH,
+            quantize=config.ST_QUANTIZE,
+            onnx_file=config.ST_ONNX_FILE,
+        )
+    raise ValueError(f"Unknown FATIRESUME_EMBEDDING_BACKEND {config.EMBEDDING_BACKEND!r}")
+
+
+@lru_cache(maxsize=None)
+def get_embedding_store(model_id: str, dim: int) -> Optional[EmbeddingStore]:
+    """The persistent store of one encoder, or None when FATIRESUME_EMBEDDING_STORE_DIR is unset."""
+    if not config.EMBEDDING_STORE_DIR:
+        return None
+    return EmbeddingStore(os.path.join(config.EMBEDDING_STORE_DIR, model_id), dim=dim, model_id=model_id)
 
 
 @lru_cache(maxsize=1)
 def get_embedding_model():
-    """Simple model that doesn't require downloads"""
-    class SimpleModel:
-        def encode(self, texts, normalize_embeddings=True):
-            # Simple keyword-based embedding
-            embeddings = []
-            for text in texts:
-                # Convert text to simple feature vector
-                text_lower = text.lower()
-                features = []
-                
-                # Common tech keywords
-                keywords = ['python', 'java', 'javascript', 'sql', 'aws', 'azure', 'gcp', 
-                           'docker', 'kubernetes', 'tensorflow', 'pytorch', 'sklearn',
-                           'machine learning', 'deep learning', 'nlp', 'computer vision',
-                           'data science', 'analytics', 'statistics', 'algorithms',
-                           'react', 'nodejs', 'mongodb', 'postgresql', 'mysql']
-                
-                for keyword in keywords:
-                    features.append(1.0 if keyword in text_lower else 0.0)
-                
-                # Add some text-based features
-                features.extend([
-                    len(text) / 1000.0,  # Text length
-                    text_lower.count('experience') / 10.0,
-                    text_lower.count('project') / 10.0,
-                    text_lower.count('skill') / 10.0,
-                ])
-                
-                # Pad to fixed size
-                while len(features) < 64:
-                    features.append(0.0)
-                features = features[:64]
-                
-                embeddings.append(features)
-            
-            result = np.array(embeddings)
-            if normalize_embeddings:
-                norms = np.linalg.norm(result, axis=1, keepdims=True)
-                result = result / (norms + 1e-8)
-            return result
-    
-    return SimpleModel()
+    """The process-wide encoder selected by FATIRESUME_EMBEDDING_BACKEND, behind the embedding cache."""
+    cache = EmbeddingCache(
+        max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES,
+        max_bytes=config.EMBEDDING_CACHE_MAX_BYTES,
+    )
+    model = _load_encoder()
+    return CachedEncoder(model, cache, store=get_embedding_store(model.model_id, model.dim))
+
+
+def describe_encoder() -> Tuple[str, int]:
+    model = get_embedding_model()
+    return model.model_id, model.dim
+
+
+_encoder_info: Optional[Tuple[str, int]] = None
+
+
+async def encoder_info() -> Tuple[str, int]:
+    """``(model_id, dim)`` of the encoder, without loading it in the API process.
+
+    The keyword model's are constants. A sentence-transformer's depend on
+    the downloaded model, so they are asked once from a CPU pool worker,
+    which loads the model for scoring anyway.
+    """
+    global _encoder_info
+    if config.EMBEDDING_BACKEND == "keyword":
+        return SimpleModel.model_id, SimpleModel.dim
+    if _encoder_info is None:
+        _encoder_info = await run_cpu(describe_encoder)
+    return _encoder_info
 
 
 def cosine_sim(a: np.ndarray, b: np.ndarray) -> float:
@@ -72,26 +140,99 @@ def split_sentences(text: str) -> List[str]:
 
 
 def extract_skills(text: str) -> List[str]:
-    # Simple skill extraction based on common keywords
-    text_lower = text.lower()
-    skills = []
-    
-    skill_keywords = [
-        'python', 'java', 'javascript', 'sql', 'aws', 'azure', 'gcp', 
-        'docker', 'kubernetes', 'tensorflow', 'pytorch', 'sklearn',
-        'machine learning', 'deep learning', 'nlp', 'computer vision',
-        'data science', 'analytics', 'statistics', 'algorithms',
-        'react', 'nodejs', 'mongodb', 'postgresql', 'mysql',
-        'excel', 'tableau', 'power bi', 'git', 'linux', 'ci/cd'
-    ]
-    
-    for skill in skill_keywords:
-        if skill in text_lower:
-            skills.append(skill)
-    
+    # Simple skill extraction based on the skill lexicon
+    skills = get_lexicons().skills_in(text)
     return skills[:10]  # Return top 10 skills
 
 
+_EVIDENCE_THRESHOLD = 0.3
+_MAX_EVIDENCE = 5
+
+
+def cosine_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise cosine similarity between the rows of ``a`` and ``b``.
+
+    The dot products use ``einsum`` rather than a BLAS matrix product, whose
+    summation order depends on the matrix shapes: each entry is then the
+    same whether a pair is scored alone or as part of a batch.
+    """
+    dots = np.einsum("id,jd->ij", a, b)
+    denom = np.outer(np.linalg.norm(a, axis=1), np.linalg.norm(b, axis=1))
+    return np.divide(dots, denom, out=np.zeros_like(dots), where=denom != 0)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first; ties keep input order.
+
+    Same order as a stable descending sort, but selects with
+    ``argpartition`` so only the k winners are sorted.
+    """
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: k - len(above)]
+        top = np.concatenate([above, ties])
+    else:
+        top = np.arange(n)
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def encode_sentences(model, texts: List[str]) -> List[Tuple[List[str], np.ndarray]]:
+    """Sentences of every text with their embeddings, from one encoder call.
+
+    Sentence vectors stay in the in-memory cache only: written to the
+    persistent store, every evidence sentence ever seen would grow it
+    without bound.
+    """
+    sentences = [split_sentences(t) for t in texts]
+    flat = [sent for sents in sentences for sent in sents]
+    embs = model.encode(flat, normalize_embeddings=True, persist=False)
+    out = []
+    start = 0
+    for sents in sentences:
+        out.append((sents, embs[start:start + len(sents)]))
+        start += len(sents)
+    return out
+
+
+def sentence_evidence(
+    resume_sentences: List[str],
+    r_embs: np.ndarray,
+    job_sentences: List[str],
+    j_embs: np.ndarray,
+) -> List[dict]:
+    """Best-matching job sentence for each resume sentence, strongest first.
+
+    Every resume sentence is compared with every job sentence through a
+    single similarity matrix.
+    """
+    if not resume_sentences or not job_sentences:
+        return []
+
+    sims = r_embs @ j_embs.T
+
+    best = sims.argmax(axis=1)
+    best_scores = sims[np.arange(len(resume_sentences)), best]
+
+    evidence = []
+    for i in np.argsort(-best_scores, kind="stable"):
+        score = float(best_scores[i])
+        if score <= _EVIDENCE_THRESHOLD:
+            break
+        evidence.append({
+            "text": resume_sentences[i],
+            "score": score,
+            "job_text": job_sentences[best[i]],
+        })
+        if len(evidence) >= _MAX_EVIDENCE:
+            break
+    return evidence
+
+
 @dataclass
 class ScoreResult:
     score: float
@@ -103,82 +244,94 @@ class ScoreResult:
 
 def score_resume(resume_text: str, job_description: str, country: Country) -> ScoreResult:
     """Simple scoring without heavy ML models"""
+    return score_resume_batch([resume_text], [job_description], country)[0][0]
+
+
+def score_resume_batch(
+    resume_texts: List[str], job_descriptions: List[str], country: Country
+) -> List[List[ScoreResult]]:
+    """Score every resume against every job; ``result[i][j]`` pairs resume i with job j.
+
+    Each distinct document is encoded and analyzed once, and all document
+    similarities come from one matrix operation.
+    """
     model = get_embedding_model()
-    
-    # Get embeddings
-    resume_emb = model.encode([resume_text], normalize_embeddings=True)[0]
-    job_emb = model.encode([job_description], normalize_embeddings=True)[0]
-    
-    # Calculate similarity
-    similarity = cosine_sim(resume_emb, job_emb)
-    
+    resumes = list(dict.fromkeys(resume_texts))
+    jobs = list(dict.fromkeys(job_descriptions))
+    if not resumes or not jobs:
+        return [[] for _ in resume_texts]
+
+    # Get embeddings and similarities
+    with metrics.span("scoring.encode"):
+        resume_embs = model.encode(resumes, normalize_embeddings=True)
+        job_embs = model.encode(jobs, normalize_embeddings=True)
+        similarities = cosine_matrix(resume_embs, job_embs)
+
     # Extract skills
-    resume_skills = set(extract_skills(resume_text))
-    job_skills = set(extract_skills(job_description))
-    
-    # Calculate skill match
-    if job_skills:
-        skill_match = len(resume_skills & job_skills) / len(job_skills)
-    else:
-        skill_match = 0.0
-    
+    with metrics.span("scoring.skills"):
+        resume_skills = [set(extract_skills(t)) for t in resumes]
+        job_skills = [set(extract_skills(t)) for t in jobs]
+
     # Calculate experience match (simple heuristic)
-    exp_match = min(1.0, resume_text.lower().count('experience') / 10.0)
-    
+    exp_matches = [min(1.0, t.lower().count('experience') / 10.0) for t in resumes]
+
+    with metrics.span("scoring.sentences"):
+        resume_sentences = encode_sentences(model, resumes)
+        job_sentences = encode_sentences(model, jobs)
+
     # Get country weights
     weights = get_country_weights(country)
-    
-    # Calculate final score
-    final_score = (
-        similarity * weights.similarity +
-        skill_match * weights.skills +
-        exp_match * weights.experience
-    ) * 100
-    
-    # Generate evidence
-    evidence = []
-    resume_sentences = split_sentences(resume_text)[:5]
-    job_sentences = split_sentences(job_description)[:5]
-    
-    for i, (r_sent, j_sent) in enumerate(zip(resume_sentences, job_sentences)):
-        r_emb = model.encode([r_sent], normalize_embeddings=True)[0]
-        j_emb = model.encode([j_sent], normalize_embeddings=True)[0]
-        sent_sim = cosine_sim(r_emb, j_emb)
-        
-        if sent_sim > 0.3:  # Threshold for evidence
-            evidence.append({
-                "text": r_sent,
-                "score": sent_sim
-            })
-    
-    # Find top matches and missing skills
-    top_matches = list(resume_skills & job_skills)[:5]
-    missing_skills = list(job_skills - resume_skills)[:5]
-    
-    return ScoreResult(
-        score=min(100.0, max(0.0, final_score)),
-        confidence=similarity,
-        evidence=evidence,
-        top_matches=top_matches,
-        missing_skills=missing_skills
-    )
 
+    scored = {}
+    for i, r_skills in enumerate(resume_skills):
+        for j, j_skills in enumerate(job_skills):
+            similarity = float(similarities[i, j])
 
-def analyze_resume(resume_text: str, job_description: str, country: Country) -> dict:
-    """Main analysis function that matches the API expectations"""
-    # Score the resume
-    result = score_resume(resume_text, job_description, country)
-    
-    # Analyze bias
-    bias_analysis = build_bias_report(resume_text)
-    
+            # Calculate skill match
+            if j_skills:
+                skill_match = len(r_skills & j_skills) / len(j_skills)
+            else:
+                skill_match = 0.0
+
+            # Calculate final score
+            final_score = (
+                similarity * weights.similarity +
+                skill_match * weights.skills +
+                exp_matches[i] * weights.experience
+            ) * 100
+
+            # Generate evidence
+            with metrics.span("scoring.evidence"):
+                evidence = sentence_evidence(*resume_sentences[i], *job_sentences[j])
+
+            # Find top matches and missing skills
+            scored[i, j] = ScoreResult(
+                score=min(100.0, max(0.0, final_score)),
+                confidence=similarity,
+                evidence=evidence,
+                top_matches=list(r_skills & j_skills)[:5],
+                missing_skills=list(j_skills - r_skills)[:5]
+            )
+
+    resume_pos = {t: i for i, t in enumerate(resumes)}
+    job_pos = {t: j for j, t in enumerate(jobs)}
+    return [
+        [scored[resume_pos[r], job_pos[jd]] for jd in job_descriptions]
+        for r in resume_texts
+    ]
+
+
+def _analysis_dict(result: ScoreResult, bias_analysis: BiasReport, country: Country) -> dict:
     # Build response in expected format
     return {
         "match_score": result.score,
         "confidence": result.confidence,
         "top_matches": result.top_matches,
         "missing_skills": result.missing_skills,
-        "evidence": [EvidenceItem(text=ev["text"], score=ev["score"]) for ev in result.evidence],
+        "evidence": [
+            EvidenceItem(text=ev["text"], score=ev["score"], job_text=ev.get("job_text"))
+            for ev in result.evidence
+        ],
         "bias_report": bias_analysis,
         "country_breakdown": {
             "country": country.value,
@@ -187,3 +340,25 @@ def analyze_resume(resume_text: str, job_description: str, country: Country) ->
             "resume_source": "text"
         }
     }
+
+
+def analyze_resume(resume_text: str, job_description: str, country: Country) -> dict:
+    """Main analysis function that matches the API expectations"""
+    return analyze_resume_batch([resume_text], [job_description], country)[0][0]
+
+
+def analyze_resume_batch(
+    resume_texts: List[str], job_descriptions: List[str], country: Country
+) -> List[List[dict]]:
+    """``analyze_resume`` for every resume/job pair, sharing per-document work."""
+    # Score the resumes
+    results = score_resume_batch(resume_texts, job_descriptions, country)
+
+    # Bias of each pair, combined from per-document scans cached by content hash
+    return [
+        [
+            _analysis_dict(result, build_bias_report(resume_text, job_description), country)
+            for job_description, result in zip(job_descriptions, row)
+        ]
+        for resume_text, row in zip(resume_texts, results)
+    ]
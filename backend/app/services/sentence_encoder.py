@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Dict
+
+from app.imports import lazy_import
+
+np = lazy_import("numpy")
+sentence_transformers = lazy_import("sentence_transformers", optional=True)
+
+QUANTIZE_MODES = ("", "int8", "onnx")
+
+
+class SentenceTransformerModel:
+    """CPU sentence-transformer encoder with the ``SimpleModel.encode`` interface.
+
+    One instance is shared by every thread of the process. Calls are
+    serialized because torch already spreads each batch over the CPU cores,
+    and concurrent batches would only compete for them.
+
+    ``quantize`` is ``""`` (float32), ``"int8"`` (torch dynamic quantization
+    of the linear layers) or ``"onnx"`` (ONNX Runtime backend, optionally a
+    quantized ``onnx_file`` such as ``onnx/model_qint8_avx512.onnx``).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 32,
+        max_seq_length: int = 256,
+        quantize: str = "",
+        onnx_file: str = "",
+    ):
+        if quantize not in QUANTIZE_MODES:
+            raise ValueError(f"Unknown quantization {quantize!r}; use one of {QUANTIZE_MODES}")
+        if sentence_transformers is None:
+            raise RuntimeError(
+                "The sentence-transformers embedding backend needs `pip install sentence-transformers`"
+            )
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.max_seq_length = max_seq_length
+        self.quantize = quantize
+
+        kwargs: Dict[str, Any] = {"device": "cpu"}
+        if quantize == "onnx":
+            kwargs["backend"] = "onnx"
+            if onnx_file:
+                kwargs["model_kwargs"] = {"file_name": onnx_file}
+        model = sentence_transformers.SentenceTransformer(model_name, **kwargs)
+        if max_seq_length > 0:
+            model.max_seq_length = max_seq_length
+        if quantize == "int8":
+            import torch
+
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._model = model
+        self._lock = threading.Lock()
+
+        self.dim = int(model.get_sentence_embedding_dimension())
+        variant = quantize or "fp32"
+        if quantize == "onnx" and onnx_file:
+            variant += f"-{onnx_file}"
+        # Part of embedding cache keys and store directory names, so kept path-safe
+        self.model_id = re.sub(r"[^A-Za-z0-9._-]+", "-", f"st-{model_name}-{variant}-{model.max_seq_length}")
+
+    def encode(self, texts, normalize_embeddings=True):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        with self._lock:
+            embeddings = self._model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=normalize_embeddings,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        return np.asarray(embeddings, dtype=np.float32)
+
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Uploaded file exceeds the {max_bytes} byte limit.")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class StoredUpload:
+    """An upload streamed to a temporary file, with its size and content hash."""
+
+    filename: str
+    path: str
+    size: int
+    sha256: str
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self) -> "StoredUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.remove()
+
+
+def store_upload(source: BinaryIO, filename: str, max_bytes: int, directory: Optional[str] = None) -> StoredUpload:
+    """Copy ``source`` to a temporary file in fixed-size chunks.
+
+    The content is hashed while it is copied, and ``UploadTooLarge`` is
+    raised as soon as more than ``max_bytes`` have been read.
+    """
+    suffix = os.path.splitext(filename.lower())[1]
+    fd, path = tempfile.mkstemp(prefix="fatiresume-", suffix=suffix, dir=directory or None)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes > 0 and size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    return StoredUpload(filename=filename, path=path, size=size, sha256=digest.hexdigest())
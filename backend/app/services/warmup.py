@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Tuple
+
+from app import config
+from app.api.schemas import Country
+from app.services.parsing import load_parser_libraries
+from app.services.pools import run_cpu, run_io
+from app.services.scoring import analyze_resume
+
+_SAMPLE_RESUME = "Python developer with SQL and Docker experience. Built machine learning projects."
+_SAMPLE_JOB = "We need a Python engineer who knows SQL, Docker and AWS."
+
+
+def warm_process() -> Tuple[int, float]:
+    """Load parsers, lexicons, numpy and the encoder in the calling process."""
+    start = time.perf_counter()
+    load_parser_libraries()
+    analyze_resume(_SAMPLE_RESUME, _SAMPLE_JOB, Country.US)
+    return os.getpid(), time.perf_counter() - start
+
+
+async def warm_up() -> None:
+    """Warm the processes that parse and score, in the background.
+
+    That is every CPU pool worker, or the API process itself when
+    ``FATIRESUME_CPU_POOL_SIZE=0``; with a pool the API process never
+    parses or encodes, so loading the encoder there would only cost
+    memory. Started from the lifespan without being awaited, so
+    ``/api/health`` answers while this runs.
+    """
+    start = time.perf_counter()
+    try:
+        if config.CPU_POOL_SIZE > 0:
+            # One task per worker so the pool starts all of its processes
+            await asyncio.gather(*(run_cpu(warm_process) for _ in range(config.CPU_POOL_SIZE)))
+        else:
+            await run_io(warm_process)
+    except Exception as e:
+        print(f"Warm-up failed: {e!r}")
+        return
+    print(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,82 @@
+"""Encoder throughput: the keyword SimpleModel against the sentence-transformer backend.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_encoders --texts 2000 --quantize "" int8
+
+Encoders are called directly, without the embedding cache, on synthetic
+resume-like sentences. The transformer rows are skipped when
+sentence-transformers is not installed.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+
+from app import config
+from app.services.scoring import SimpleModel
+from app.services.sentence_encoder import SentenceTransformerModel, sentence_transformers
+
+_WORDS = (
+    "python java sql docker kubernetes aws azure react analytics statistics machine learning "
+    "project experience skill team built led designed improved pipeline service api data model"
+).split()
+
+
+def synthetic_texts(n: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 40))) + "." for _ in range(n)]
+
+
+def measure(encode: Callable[[List[str]], object], texts: List[str], repeat: int) -> Tuple[float, float]:
+    """Best wall time over ``repeat`` runs and the matching texts per second."""
+    encode(texts[: min(len(texts), 32)])  # load weights, allocate buffers
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode(texts)
+        best = min(best, time.perf_counter() - start)
+    return best, len(texts) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--model", default=config.ST_MODEL)
+    parser.add_argument("--batch-size", type=int, default=config.ST_BATCH_SIZE)
+    parser.add_argument("--max-seq-length", type=int, default=config.ST_MAX_SEQ_LENGTH)
+    parser.add_argument("--quantize", nargs="*", default=[config.ST_QUANTIZE], help='"" (float32), int8, onnx')
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.texts)
+    rows = []
+
+    keyword = SimpleModel()
+    rows.append((keyword.model_id, *measure(keyword.encode, texts, args.repeat)))
+
+    if sentence_transformers is None:
+        print("sentence-transformers is not installed; skipping the transformer backend")
+    for quantize in args.quantize if sentence_transformers is not None else []:
+        try:
+            model = SentenceTransformerModel(
+                args.model,
+                batch_size=args.batch_size,
+                max_seq_length=args.max_seq_length,
+                quantize=quantize,
+                onnx_file=config.ST_ONNX_FILE,
+            )
+        except Exception as e:
+            print(f"Skipping quantize={quantize!r}: {e!r}")
+            continue
+        rows.append((model.model_id, *measure(model.encode, texts, args.repeat)))
+
+    print(f"{'encoder':<60} {'seconds':>9} {'texts/s':>11}")
+    for name, seconds, rate in rows:
+        print(f"{name:<60} {seconds:>9.3f} {rate:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Deterministic inputs for the benchmarks: documents, PDFs, DOCX files and postings."""
+from __future__ import annotations
+
+import os
+import random
+from io import BytesIO
+from typing import Any, Dict, List
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_WORDS = (
+    "python java sql docker kubernetes aws azure gcp react nodejs analytics statistics tableau excel "
+    "machine learning deep learning nlp data science experience project skill team built led designed "
+    "improved pipeline service api model production customers revenue latency dashboards aggressive "
+    "young energetic native oxford"
+).split()
+
+
+def _read_example(name: str) -> str:
+    with open(os.path.join(_REPO_ROOT, name), "r", encoding="utf-8") as fh:
+        return fh.read()
+
+
+def example_resume(scale: int = 1) -> str:
+    """``example_resume.txt`` repeated ``scale`` times."""
+    return "\n".join([_read_example("example_resume.txt")] * scale)
+
+
+def example_job() -> str:
+    return _read_example("example_job_description.txt")
+
+
+def synthetic_text(chars: int, seed: int = 0) -> str:
+    """Resume-like sentences totalling about ``chars`` characters."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    size = 0
+    while size < chars:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 20))).capitalize() + "."
+        parts.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(parts)[:chars]
+
+
+def _page_lines(page: int, lines: int) -> List[str]:
+    rng = random.Random(page)
+    return [" ".join(rng.choice(_WORDS) for _ in range(10)) for _ in range(lines)]
+
+
+def make_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """A minimal text PDF with Helvetica text lines on every page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(pages))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>")
+    font = 3 + 2 * pages
+    for i in range(pages):
+        shown = " ".join(f"({line}) '" for line in _page_lines(i, lines_per_page))
+        stream = f"BT /F1 10 Tf 40 800 Td 12 TL {shown} ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def make_docx(pages: int, lines_per_page: int = 40) -> bytes:
+    """A DOCX with one paragraph per line and a page break between pages."""
+    from docx import Document
+
+    doc = Document()
+    for i in range(pages):
+        for line in _page_lines(i, lines_per_page):
+            doc.add_paragraph(line)
+        if i + 1 < pages:
+            doc.add_page_break()
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def synthetic_postings(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """``n`` postings as ``select_jobs`` returns them, with a few duplicates mixed in."""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(n):
+        # About 5% repeat an earlier URL, as when providers overlap
+        ident = rng.randrange(i) if i and rng.random() < 0.05 else i
+        jobs.append(
+            {
+                "title": f"{rng.choice(_WORDS).title()} Engineer {ident}",
+                "company": f"Company {ident % 997}",
+                "location": "Remote",
+                "url": f"https://jobs.example.com/{ident}",
+                "description": synthetic_text(rng.randint(200, 1200), seed=ident),
+                "source": "benchmark",
+            }
+        )
+    return jobs
@@ -0,0 +1,221 @@
+"""Benchmarks for the scoring, bias, parsing and job-ranking hot paths.
+
+Run from ``backend/``::
+
+    python -m benchmarks.hotpaths run --out before.json
+    python -m benchmarks.hotpaths run --out after.json --only rank_jobs
+    python -m benchmarks.hotpaths compare before.json after.json --threshold 0.1
+
+Each case reports latency percentiles, throughput in its own unit (calls,
+chars, pages or postings per second) and peak traced Python/numpy memory
+of one call. Caches are cleared before every call unless ``--warm`` is
+given. Work done in PDF pool processes is timed but not memory-traced.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from app import config
+from app.api.schemas import Country
+from app.services.bias import build_bias_report, get_bias_scanner
+from app.services.job_corpus import JobCorpus, encode_job_texts, encode_resume, job_text
+from app.services.jobs import rank_jobs
+from app.services.parsing import parse_docx_bytes, parse_pdf_bytes
+from app.services.scoring import analyze_resume, get_embedding_model, score_resume
+from benchmarks import fixtures
+from benchmarks.results import compare_results, load_results, print_comparison, save_results, summarize
+
+
+@dataclass
+class Case:
+    name: str
+    size: int
+    unit: str
+    # Units of work per call, for throughput
+    items: int
+    setup: Callable[[], Callable[[], Any]]
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+def reset_caches() -> None:
+    get_embedding_model().cache.clear()
+    get_bias_scanner().clear()
+
+
+def _pdf_case(pages: int, backend: str) -> Case:
+    def setup():
+        data = fixtures.make_pdf(pages)
+        fast = [] if backend == "pdfplumber" else [backend]
+
+        def call():
+            saved = config.PDF_FAST_BACKENDS
+            config.PDF_FAST_BACKENDS = fast
+            try:
+                return parse_pdf_bytes(data)
+            finally:
+                config.PDF_FAST_BACKENDS = saved
+
+        return call
+
+    return Case(f"parse_pdf_bytes.{backend}", pages, "pages", pages, setup)
+
+
+def _corpus_case(n: int, packed: bool) -> Case:
+    def setup():
+        # Up to 10k distinct postings, tiled to n rows
+        postings = fixtures.synthetic_postings(min(n, 10_000))
+        embeddings = encode_job_texts([job_text(p) for p in postings])
+        reps = -(-n // len(postings))
+        corpus = JobCorpus(embeddings.shape[1], max_jobs=n, model_id="bench", packed=packed)
+        corpus.add(
+            [dict(postings[i % len(postings)], url=f"https://example.com/jobs/{i}") for i in range(n)],
+            np.tile(embeddings, (reps, 1))[:n],
+        )
+        query = encode_resume(fixtures.example_resume())
+        return lambda: corpus.search(query, 10)
+
+    return Case(f"corpus_search.{'packed' if packed else 'dense'}", n, "postings", n, setup)
+
+
+def build_cases(quick: bool) -> List[Case]:
+    job = fixtures.example_job()
+    cases: List[Case] = []
+
+    for scale in (1, 4) if quick else (1, 4, 16):
+        resume = fixtures.example_resume(scale)
+        cases.append(Case("score_resume", scale, "calls", 1, lambda r=resume: lambda: score_resume(r, job, Country.US)))
+        cases.append(Case("analyze_resume", scale, "calls", 1, lambda r=resume: lambda: analyze_resume(r, job, Country.US)))
+
+    for chars in (1_000, 10_000) if quick else (1_000, 10_000, 100_000):
+        text = fixtures.synthetic_text(chars)
+        cases.append(Case("build_bias_report", chars, "chars", chars, lambda t=text: lambda: build_bias_report(t)))
+
+    for pages in (1, 10) if quick else (1, 10, 50):
+        cases.append(_pdf_case(pages, "pdfium"))
+        cases.append(_pdf_case(pages, "pdfplumber"))
+        cases.append(
+            Case(
+                "parse_docx_bytes",
+                pages,
+                "pages",
+                pages,
+                lambda p=pages: (lambda data: lambda: parse_docx_bytes(data))(fixtures.make_docx(p)),
+            )
+        )
+
+    resume = fixtures.example_resume()
+    for n in (10, 1_000) if quick else (10, 100, 1_000, 10_000, 100_000):
+        cases.append(
+            Case(
+                "rank_jobs",
+                n,
+                "postings",
+                n,
+                lambda n=n: (lambda jobs: lambda: rank_jobs(resume, jobs, 10))(fixtures.synthetic_postings(n)),
+            )
+        )
+
+    for n in (10_000, 100_000) if quick else (10_000, 100_000, 1_000_000):
+        cases.append(_corpus_case(n, packed=False))
+        cases.append(_corpus_case(n, packed=True))
+    return cases
+
+
+def measure(case: Case, min_repeats: int, max_repeats: int, min_time: float, warm: bool) -> Dict[str, Any]:
+    fn = case.setup()
+    fn()  # first call pays imports and lazy initialization
+
+    latencies: List[float] = []
+    started = time.perf_counter()
+    while len(latencies) < max_repeats and (
+        len(latencies) < min_repeats or time.perf_counter() - started < min_time
+    ):
+        if not warm:
+            reset_caches()
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    if not warm:
+        reset_caches()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    summary = summarize(latencies)
+    return {
+        "key": case.key,
+        "case": case.name,
+        "size": case.size,
+        "unit": case.unit,
+        **summary,
+        "throughput": case.items / (summary["mean_ms"] / 1000.0),
+        "peak_kib": peak / 1024.0,
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    cases = [c for c in build_cases(args.quick) if not args.only or any(o in c.key for o in args.only)]
+    print(f"{'case':<34} {'n':>4} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'throughput':>16} {'peak KiB':>10}")
+    results = []
+    for case in cases:
+        result = measure(case, args.repeats, args.max_repeats, args.min_time, args.warm)
+        results.append(result)
+        print(
+            f"{case.key:<34} {result['n']:>4} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} "
+            f"{result['p99_ms']:>10.2f} {result['throughput']:>10.1f} {case.unit + '/s':<5} {result['peak_kib']:>10.0f}"
+        )
+    if args.out:
+        save_results(args.out, "hotpaths", results, {"warm": args.warm, "quick": args.quick})
+        print(f"Saved {len(results)} results to {args.out}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    rows, regressions = compare_results(
+        load_results(args.old), load_results(args.new), metric=args.metric, threshold=args.threshold
+    )
+    print_comparison(rows, regressions, args.metric)
+    return 1 if regressions else 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot path benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--out", help="write results to this JSON file")
+    run_parser.add_argument("--only", nargs="*", help="run cases whose key contains any of these strings")
+    run_parser.add_argument("--quick", action="store_true", help="smaller input sizes")
+    run_parser.add_argument("--warm", action="store_true", help="keep caches between calls")
+    run_parser.add_argument("--repeats", type=int, default=5, help="minimum calls per case")
+    run_parser.add_argument("--max-repeats", type=int, default=200)
+    run_parser.add_argument("--min-time", type=float, default=1.0, help="seconds to keep repeating a case")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = sub.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--metric", default="p50_ms")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
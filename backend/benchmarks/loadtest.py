@@ -0,0 +1,302 @@
+"""HTTP load test of one API worker with stubbed job providers.
+
+Run from ``backend/``::
+
+    python -m benchmarks.loadtest run --concurrency 1 4 16 64 --mix analyze=3,jobs=1 --out load.json
+    python -m benchmarks.loadtest run --provider-latency-ms 300 --provider-failure-rate 0.1
+    python -m benchmarks.loadtest compare before.json after.json
+
+Starts ``benchmarks.stub_providers`` and a single uvicorn worker serving
+``app.main:create_app`` with the Remotive/Arbeitnow URLs pointed at the
+stub. Then, for each concurrency level, that many closed-loop clients
+send a weighted mix of ``/api/analyze`` and ``/api/jobs`` requests for
+``--duration`` seconds. Per endpoint and level it reports throughput,
+errors and p50/p95/p99 latency, then the saturation throughput (the best
+level) of each endpoint.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks import fixtures
+from benchmarks.results import compare_results, load_results, print_comparison, save_results, summarize
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_QUERIES = ("python", "data science", "machine learning", "sql analytics", "react nodejs", "kubernetes aws")
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("analyze", "jobs"):
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r}; use analyze and/or jobs")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def _request(endpoint: str, rng: random.Random, resumes: List[str], job: str) -> Tuple[str, Dict[str, str]]:
+    resume = rng.choice(resumes)
+    if endpoint == "analyze":
+        return "/api/analyze", {"resume_text": resume, "job_description": job, "country": "US"}
+    return "/api/jobs", {"resume_text": resume, "query": rng.choice(_QUERIES)}
+
+
+async def _client_loop(
+    client: httpx.AsyncClient,
+    seed: int,
+    weights: Dict[str, float],
+    resumes: List[str],
+    job: str,
+    deadline: float,
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int],
+) -> None:
+    rng = random.Random(seed)
+    names = list(weights)
+    shares = [weights[n] for n in names]
+    while time.perf_counter() < deadline:
+        endpoint = rng.choices(names, weights=shares)[0]
+        path, form = _request(endpoint, rng, resumes, job)
+        start = time.perf_counter()
+        try:
+            r = await client.post(path, data=form)
+            ok = r.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - start
+        if ok:
+            samples[endpoint].append(elapsed)
+        else:
+            errors[endpoint] += 1
+
+
+async def run_level(
+    base_url: str, concurrency: int, duration: float, warmup: float, weights: Dict[str, float], timeout: float
+) -> List[Dict[str, Any]]:
+    resumes = [fixtures.example_resume()] + [fixtures.synthetic_text(3000, seed=i) for i in range(7)]
+    job = fixtures.example_job()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        if warmup > 0:
+            until = time.perf_counter() + warmup
+            ignored: Dict[str, List[float]] = {n: [] for n in weights}
+            ignored_errors = {n: 0 for n in weights}
+            await asyncio.gather(
+                *(
+                    _client_loop(client, -i - 1, weights, resumes, job, until, ignored, ignored_errors)
+                    for i in range(concurrency)
+                )
+            )
+
+        samples: Dict[str, List[float]] = {n: [] for n in weights}
+        errors: Dict[str, int] = {n: 0 for n in weights}
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *(_client_loop(client, i, weights, resumes, job, deadline, samples, errors) for i in range(concurrency))
+        )
+        # Clients finish their last request after the deadline
+        elapsed = time.perf_counter() - started
+
+    results = []
+    for endpoint in weights:
+        summary = summarize(samples[endpoint])
+        results.append(
+            {
+                "key": f"{endpoint}@c{concurrency}",
+                "endpoint": endpoint,
+                "concurrency": concurrency,
+                **summary,
+                "errors": errors[endpoint],
+                "throughput": len(samples[endpoint]) / elapsed,
+            }
+        )
+    return results
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def _start_servers(args: argparse.Namespace) -> Tuple[subprocess.Popen, subprocess.Popen]:
+    stub = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.stub_providers",
+            "--port", str(args.stub_port),
+            "--latency-ms", str(args.provider_latency_ms),
+            "--jitter-ms", str(args.provider_jitter_ms),
+            "--failure-rate", str(args.provider_failure_rate),
+            "--hang-rate", str(args.provider_hang_rate),
+        ],
+        cwd=_BACKEND_DIR,
+        start_new_session=True,
+    )
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    env = dict(os.environ)
+    env.update(
+        {
+            "FATIRESUME_REMOTIVE_URL": f"{stub_url}/remotive",
+            "FATIRESUME_ARBEITNOW_URL": f"{stub_url}/arbeitnow",
+            "FATIRESUME_JOB_CACHE_TTL": str(args.job_cache_ttl),
+            "FATIRESUME_JOB_CORPUS": "0",
+        }
+    )
+    app = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory",
+            "--port", str(args.port), "--workers", "1", "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=_BACKEND_DIR,
+        env=env,
+        # Own process group, so CPU pool workers are killed with the app
+        start_new_session=True,
+        stdout=None if args.app_output else subprocess.DEVNULL,
+        stderr=None if args.app_output else subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(f"{stub_url}/stats", stub, 30)
+        _wait_ready(f"http://127.0.0.1:{args.port}/api/health", app, 60)
+    except Exception:
+        _stop(app, stub)
+        raise
+    return stub, app
+
+
+def _stop(*processes: Optional[subprocess.Popen]) -> None:
+    for process in processes:
+        if process is not None and process.poll() is None:
+            process.terminate()
+    for process in processes:
+        if process is not None:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                pass
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+
+def print_level(results: List[Dict[str, Any]]) -> None:
+    for r in results:
+        if not r["n"]:
+            print(f"{r['key']:<14} no successful requests, {r['errors']} errors")
+            continue
+        print(
+            f"{r['key']:<14} {r['throughput']:>9.1f} req/s {r['errors']:>6} err "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} ms (p50/p95/p99)"
+        )
+
+
+def saturation(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Best throughput of each endpoint and the concurrency that reached it."""
+    best: Dict[str, Dict[str, Any]] = {}
+    for r in results:
+        current = best.get(r["endpoint"])
+        if current is None or r["throughput"] > current["throughput"]:
+            best[r["endpoint"]] = {"throughput": r["throughput"], "concurrency": r["concurrency"], "p99_ms": r.get("p99_ms")}
+    return best
+
+
+def run(args: argparse.Namespace) -> int:
+    weights = args.mix
+    stub = app = None
+    base_url = args.url
+    if not base_url:
+        stub, app = _start_servers(args)
+        base_url = f"http://127.0.0.1:{args.port}"
+    results: List[Dict[str, Any]] = []
+    try:
+        for concurrency in args.concurrency:
+            level = asyncio.run(run_level(base_url, concurrency, args.duration, args.warmup, weights, args.timeout))
+            print_level(level)
+            results.extend(level)
+    finally:
+        _stop(app, stub)
+
+    print("Saturation throughput:")
+    best = saturation(results)
+    for endpoint, b in best.items():
+        print(f"  {endpoint:<8} {b['throughput']:.1f} req/s at concurrency {b['concurrency']}")
+    if args.out:
+        extra = {
+            "mix": weights,
+            "duration": args.duration,
+            "provider_latency_ms": args.provider_latency_ms,
+            "provider_failure_rate": args.provider_failure_rate,
+            "provider_hang_rate": args.provider_hang_rate,
+            "job_cache_ttl": args.job_cache_ttl,
+            "saturation": best,
+        }
+        save_results(args.out, "loadtest", results, extra)
+        print(f"Saved {len(results)} results to {args.out}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    rows, regressions = compare_results(
+        load_results(args.old), load_results(args.new), metric=args.metric, threshold=args.threshold
+    )
+    print_comparison(rows, regressions, args.metric)
+    return 1 if regressions else 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP load test with stubbed job providers")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run a concurrency sweep")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    run_parser.add_argument("--mix", type=parse_mix, default=parse_mix("analyze=3,jobs=1"))
+    run_parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per level")
+    run_parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds per level")
+    run_parser.add_argument("--timeout", type=float, default=60.0, help="client timeout per request")
+    run_parser.add_argument("--url", help="load an already running server instead of starting one")
+    run_parser.add_argument("--port", type=int, default=8799)
+    run_parser.add_argument("--stub-port", type=int, default=8798)
+    run_parser.add_argument("--provider-latency-ms", type=float, default=150.0)
+    run_parser.add_argument("--provider-jitter-ms", type=float, default=50.0)
+    run_parser.add_argument("--provider-failure-rate", type=float, default=0.0)
+    run_parser.add_argument("--provider-hang-rate", type=float, default=0.0)
+    run_parser.add_argument(
+        "--job-cache-ttl", type=float, default=0.0, help="FATIRESUME_JOB_CACHE_TTL for the app (0 = every search hits the stub)"
+    )
+    run_parser.add_argument("--app-output", action="store_true", help="show the app's log output")
+    run_parser.add_argument("--out", help="write results to this JSON file")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = sub.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--metric", default="p99_ms")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Shared result handling for the benchmarks: summaries, JSON files and run comparison."""
+from __future__ import annotations
+
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def summarize(latencies: Sequence[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds from samples in seconds."""
+    ms = np.asarray(latencies, dtype=np.float64) * 1000.0
+    if not len(ms):
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "n": int(len(ms)),
+        "mean_ms": float(ms.mean()),
+        "min_ms": float(ms.min()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(ms.max()),
+    }
+
+
+def run_metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_results(path: str, kind: str, results: List[Dict[str, Any]], extra: Optional[Dict[str, Any]] = None) -> None:
+    payload = {"kind": kind, "meta": {**run_metadata(), **(extra or {})}, "results": results}
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2)
+        fh.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def compare_results(
+    old: Dict[str, Any], new: Dict[str, Any], metric: str = "p50_ms", threshold: float = 0.10
+) -> Tuple[List[Tuple[str, float, float, float]], List[str]]:
+    """Match results by ``key`` and return ``(rows, regressions)``.
+
+    Each row is ``(key, old, new, relative change)``. A result regresses when
+    ``metric`` grew by more than ``threshold`` (0.10 = 10%).
+    """
+    old_by_key = {r["key"]: r for r in old["results"]}
+    rows = []
+    regressions = []
+    for result in new["results"]:
+        before = old_by_key.get(result["key"])
+        if before is None or metric not in before or metric not in result:
+            continue
+        a, b = float(before[metric]), float(result[metric])
+        change = (b - a) / a if a else 0.0
+        rows.append((result["key"], a, b, change))
+        if change > threshold:
+            regressions.append(result["key"])
+    return rows, regressions
+
+
+def print_comparison(rows: List[Tuple[str, float, float, float]], regressions: List[str], metric: str) -> None:
+    width = max([len(key) for key, *_ in rows] + [4])
+    print(f"{'case':<{width}} {'old ' + metric:>14} {'new ' + metric:>14} {'change':>8}")
+    for key, a, b, change in rows:
+        flag = "  REGRESSION" if key in regressions else ""
+        print(f"{key:<{width}} {a:>14.3f} {b:>14.3f} {change:>+8.1%}{flag}")
+    print(f"{len(regressions)} regression(s) out of {len(rows)} compared case(s)")
@@ -0,0 +1,113 @@
+"""Local stand-in for the Remotive and Arbeitnow job APIs, for load tests.
+
+    python -m benchmarks.stub_providers --port 8765 --latency-ms 200 --failure-rate 0.05
+
+Serves ``/remotive`` and ``/arbeitnow`` in the providers' JSON formats.
+Each response waits ``latency-ms`` plus uniform jitter; ``failure-rate`` of
+them return 500 and ``hang-rate`` of them stall for ``hang-ms`` (longer
+than the app's provider timeout, by default) before answering.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+from typing import Any, Dict
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from benchmarks import fixtures
+
+
+def create_stub_app(
+    latency_ms: float = 100.0,
+    jitter_ms: float = 0.0,
+    failure_rate: float = 0.0,
+    hang_rate: float = 0.0,
+    hang_ms: float = 15000.0,
+    jobs: int = 30,
+    seed: int = 0,
+) -> FastAPI:
+    rng = random.Random(seed)
+    postings = fixtures.synthetic_postings(jobs, seed=seed)
+    app = FastAPI(title="Job provider stub")
+    app.state.requests = 0
+
+    async def respond(payload: Dict[str, Any]):
+        app.state.requests += 1
+        roll = rng.random()
+        if roll < hang_rate:
+            await asyncio.sleep(hang_ms / 1000.0)
+        else:
+            await asyncio.sleep((latency_ms + rng.uniform(0.0, jitter_ms)) / 1000.0)
+        if hang_rate <= roll < hang_rate + failure_rate:
+            return JSONResponse({"error": "stub failure"}, status_code=500)
+        return payload
+
+    remotive_payload = {
+        "jobs": [
+            {
+                "title": p["title"],
+                "company_name": p["company"],
+                "candidate_required_location": p["location"],
+                "url": f"{p['url']}/remotive",
+                "description": p["description"],
+            }
+            for p in postings
+        ]
+    }
+    arbeitnow_payload = {
+        "data": [
+            {
+                "title": p["title"],
+                "company_name": p["company"],
+                "location": p["location"],
+                "url": f"{p['url']}/arbeitnow",
+                "description": p["description"],
+            }
+            for p in postings
+        ]
+    }
+
+    @app.get("/remotive")
+    async def remotive(search: str = ""):
+        return await respond(remotive_payload)
+
+    @app.get("/arbeitnow")
+    async def arbeitnow(search: str = ""):
+        return await respond(arbeitnow_payload)
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Job provider stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-ms", type=float, default=15000.0)
+    parser.add_argument("--jobs", type=int, default=30, help="postings per response")
+    args = parser.parse_args()
+
+    app = create_stub_app(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        hang_rate=args.hang_rate,
+        hang_ms=args.hang_ms,
+        jobs=args.jobs,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()